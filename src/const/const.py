@@ -64,3 +64,15 @@ class ARCHIVE_TABLE_COLUMNS(TableColumns):
     latest_status = "latest_status"
     before_status = "before_status"
     archive_date = "archive_date"  # アーカイブ日時
+
+
+# オーダーシートカラム定義
+class ORDER_TABLE_COLUMNS(TableColumns):
+    string_id = "string_id"
+    string_type = "string_type"
+    fingerprint = "fingerprint"  # (string_id, string_type, text_body) のフィンガープリント
+
+
+# メタシートの行（A列）
+META_SHEET_DIR_META_ROW = 0  # dirのメタ情報
+META_SHEET_CONTENT_DIGEST_ROW = 1  # datの内容のダイジェスト
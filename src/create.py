@@ -1,7 +1,6 @@
 import sys
 from dotenv import load_dotenv
 import os
-import pandas as pd
 
 load_dotenv()
 
@@ -13,8 +12,10 @@ sys.path.append(".")  # srcをパスに追加してサブモジュール群を
 import src.const.const as const  # 定数読み込み
 from src.master.dat_master import DatMaster
 from src.master.dir_master import DirMaster
-from src.master.sheet_master import SheetMaster
+from src.master.dat_dir_writer import dump_dat_dir
+from src.master.sheet_master import SheetMaster, columns_to_dataframe
 from src.utils.remaining_util import ProgressTracker
+from src.utils.sheet_mirror import SheetMirror
 
 
 def main():
@@ -25,19 +26,50 @@ def main():
     credentials_path = os.getenv("GOOGLE_CREDENTIALS_PATH")
     spreadsheet_id = os.getenv("GOOGLE_SPREADSHEET_ID")
 
-    sheet_master = SheetMaster(credentials_path, spreadsheet_id)
+    # スプレッドシートが前回の取得から変更されていなければ、ローカルのミラーから読み込む
+    sheet_master = SheetMaster(credentials_path, spreadsheet_id, mirror=SheetMirror.from_env())
 
     main_tracker.update()
-    print("Getting translate sheet data")
-    # スプレッドシートから翻訳シートのデータを取得
-    translate_sheet_data = sheet_master.get_sheet_data(const.TRANSLATE_SHEET_NAME)
-    if not translate_sheet_data:
+    print("Getting sheet data")
+    # 翻訳シート・メタシート・オーダーシートを1リクエストでまとめて取得する
+    # 翻訳シートとオーダーシートはこの後使う列だけを取得する
+    translate_column_names = [
+        const.TRANSLATE_TABLE_COLUMNS.string_id.value,
+        const.TRANSLATE_TABLE_COLUMNS.string_type.value,
+        const.TRANSLATE_TABLE_COLUMNS.text_body.value,
+        const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value,
+        const.TRANSLATE_TABLE_COLUMNS.latest_status.value,
+    ]
+    sheets_data = sheet_master.get_sheets_data(
+        [const.TRANSLATE_SHEET_NAME, const.META_SHEET_NAME, const.ORDER_SHEET_NAME],
+        columns={
+            const.TRANSLATE_SHEET_NAME: [
+                const.TRANSLATE_TABLE_COLUMNS.column_names().index(name)
+                for name in translate_column_names
+            ],
+            # フィンガープリントの列は update.py だけが使う
+            const.ORDER_SHEET_NAME: [
+                const.ORDER_TABLE_COLUMNS.column_names().index(name)
+                for name in [
+                    const.ORDER_TABLE_COLUMNS.string_id.value,
+                    const.ORDER_TABLE_COLUMNS.string_type.value,
+                ]
+            ],
+        },
+    )
+    if not sheets_data:
+        print("Error: Failed to get sheet data.")
+        sys.exit(1)
+
+    translate_sheet_data = sheets_data[const.TRANSLATE_SHEET_NAME]
+    if not translate_sheet_data or not translate_sheet_data[0]:
         print("Error: Failed to get translate_sheet data.")
         sys.exit(1)
+    if [column[0] for column in translate_sheet_data] != translate_column_names:
+        print("Error: Unexpected translate_sheet header.")
+        sys.exit(1)
 
-    translate_sheet_df = pd.DataFrame(
-        translate_sheet_data[1:], columns=translate_sheet_data[0]
-    )
+    translate_sheet_df = columns_to_dataframe(translate_sheet_data)
 
     # translate_sheet_dfをstring_idとstring_typeをキーとした辞書に変換
     translate_init_tracker = ProgressTracker(
@@ -63,21 +95,18 @@ def main():
     translate_init_tracker.finish()
 
     main_tracker.update()
-    print("Getting meta sheet data")
-    # スプレッドシートからdirのメタ情報を取得
-    meta_sheet_data = sheet_master.get_sheet_data(const.META_SHEET_NAME)
-    if not meta_sheet_data:
+    # dirのメタ情報（A1セル）
+    meta_sheet_data = sheets_data[const.META_SHEET_NAME]
+    if not meta_sheet_data or not meta_sheet_data[0]:
         print("Error: Failed to get meta sheet data.")
         sys.exit(1)
 
     main_tracker.update()
-    print("Getting order sheet data")
-    # スプレッドシートからオーダーシートのデータを取得
-    order_sheet_data = sheet_master.get_sheet_data(const.ORDER_SHEET_NAME)
-    if not order_sheet_data:
+    order_sheet_data = sheets_data[const.ORDER_SHEET_NAME]
+    if not order_sheet_data or not order_sheet_data[0]:
         print("Error: Failed to get order sheet data.")
         sys.exit(1)
-    order_sheet_df = pd.DataFrame(order_sheet_data[1:], columns=order_sheet_data[0])
+    order_sheet_df = columns_to_dataframe(order_sheet_data)
 
     main_tracker.update()
     print("Creating dat dir file")
@@ -125,7 +154,7 @@ def main():
     dir_master.add_records(dir_records)
 
     main_tracker.update()
-    print("Updating byte sizes")
+    print("Replacing translate text")
     # 翻訳シートからlatest_statusが「翻訳済み」または「仮実装」のstring_idとstring_typeのリストを取得
     translated_rows = translate_sheet_df[
         (translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.latest_status.value] == const.TRANSLATE_STATUS.翻訳済み.value) | (translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.latest_status.value] == const.TRANSLATE_STATUS.仮実装.value)
@@ -137,49 +166,28 @@ def main():
         ]
     ].to_dict(orient="records")
 
-    # dat_masterのデータをstring_idとstring_typeをキーとした辞書に変換
-    dat_master_data = dat_master.get_master_data()
-    dat_master_dict = {}  # ここで初期化
-    dat_dict_init_tracker = ProgressTracker(
-        len(dat_master_data), description="Creating dat dict"
-    )
-    for index, row in dat_master_data.iterrows():  # loopはiterrows()でOK
-        key = (
-            str(row[const.STRING_TABLE_COLUMNS.string_id.value]).replace(
-                const.UTF8BOM_START_BYTE, ""
-            ),
-            row[const.STRING_TABLE_COLUMNS.string_type.value],
-        )
-        dat_master_dict[key] = index  # indexだけ保持
-        dat_dict_init_tracker.update()
-    dat_dict_init_tracker.finish()
-
     # translated_idsの各行について、dat_masterのtext_bodyをtranslate_sheetのtranslate_text_bodyで置き換える
+    # dat_masterは(string_id, string_type)のハッシュインデックスを持つため、キー検索はO(1)
     translate_tracker = ProgressTracker(
         len(translated_ids), description="Replace translate text"
     )
     for row in translated_ids:  # translated_idsをloop
         key = (row["string_id"], row["string_type"])
-        index = dat_master_dict.get(key)  # get()で高速lookup
-        if index is not None:  # keyが存在する場合のみ処理
+        if dat_master.has_record(*key):  # keyが存在する場合のみ処理
             # translate_sheet_translate_dictからtranslate_text_bodyを取得
             translate_text_body = translate_sheet_translate_dict.get(
                 key
             )  # get()で高速lookup
             if translate_text_body is not None:  # text_bodyが存在する場合のみ処理
                 # dat_masterのtext_bodyを更新
-                dat_master.get_master_data().loc[
-                    index, const.STRING_TABLE_COLUMNS.text_body.value
-                ] = translate_text_body
+                dat_master.update_record(*key, translate_text_body)
             else:
                 print(f"Warning: translate_text_body not found for key={key}")
         else:
-            print(f"Warning: key={key} not found in dat_master_dict")
+            print(f"Warning: key={key} not found in dat_master")
         translate_tracker.update()
     translate_tracker.finish()
 
-    dir_master.update_byte_sizes(dat_master)
-
     main_tracker.update()
     print("Dumping master data")
     # ja_jp_data.datとja_jp_data.dirをダンプして処理を終了
@@ -191,8 +199,8 @@ def main():
     os.makedirs(os.path.dirname(jp_dat_path), exist_ok=True)
     os.makedirs(os.path.dirname(jp_dir_path), exist_ok=True)
 
-    dat_master.dump_master_data(jp_dat_path)
-    dir_master.dump_master_data(jp_dir_path)
+    # datを書き出しながらdirのオフセットとバイト長を求め、続けてdirを書き出す
+    dump_dat_dir(dat_master, dir_master, jp_dat_path, jp_dir_path)
 
     main_tracker.finish()
 
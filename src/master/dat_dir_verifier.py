@@ -0,0 +1,127 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import src.const.const as const  # 定数読み込み
+from src.master.dir_master import DirMaster
+
+UTF8_BOM = b"\xef\xbb\xbf"
+DAT_LINE_END = b"\r\n"
+# サマリーに載せる不一致の例の最大件数
+MAX_SAMPLES = 100
+
+
+def _find_string_id_mismatches(dat_path, string_ids, offsets):
+    """
+    プロセスプールで実行されるワーカー。各オフセットの位置が「string_id + タブ」で始まっているか確認し、
+    一致しなかった要素の添字を返す。
+    """
+    mismatches = []
+    with open(dat_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i, (string_id, offset) in enumerate(zip(string_ids, offsets)):
+                expected = string_id.encode("utf-8") + b"\t"
+                if mm[offset : offset + len(expected)] != expected:
+                    mismatches.append(i)
+    return mismatches
+
+
+def verify_dat_dir(dat_path, dir_path, processes=None, chunk_size=50000):
+    """
+    生成されたdat/dirの組を検証し、結果のサマリーを辞書で返す。
+    - datがUTF-8 BOMで始まり、最初のレコードがBOMの直後(3バイト目)から始まっていること
+    - 各レコードの直後に改行コードがあり、次のレコードとの間に重なりや隙間がないこと
+    - 最後のレコードの改行コードでdatが終わっていること
+    - 各オフセットがdirと同じstring_idのレコードを指していること（プロセスプールで並列に確認）
+    :param dat_path: datファイルのパス
+    :param dir_path: dirファイルのパス
+    :param processes: string_idの照合に使うプロセス数。Noneの場合はCPU数
+    :param chunk_size: 1ワーカーが照合するdir行の数
+    """
+    dir_data = DirMaster.from_path(dir_path).get_master_data()
+    string_ids = dir_data[const.UI_TABLE_COLUMNS.string_id.value].tolist()
+    offsets = dir_data[const.UI_TABLE_COLUMNS.total_byte_size.value].to_numpy(dtype=np.int64)
+    byte_sizes = dir_data[const.UI_TABLE_COLUMNS.byte_size.value].to_numpy(dtype=np.int64)
+    dat_size = os.path.getsize(dat_path)
+
+    ends = offsets + byte_sizes
+    # オフセット・バイト長がdatの範囲外
+    out_of_range = (offsets < 0) | (byte_sizes < 0) | (ends + len(DAT_LINE_END) > dat_size)
+    in_range = ~out_of_range
+
+    # レコード直後の改行コード
+    terminator_ok = np.zeros(len(offsets), dtype=bool)
+    with open(dat_path, "rb") as f:
+        dat_head = f.read(len(UTF8_BOM))
+        if dat_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                dat_bytes = np.frombuffer(mm, dtype=np.uint8)
+                terminator_ok[in_range] = (
+                    dat_bytes[ends[in_range]] == DAT_LINE_END[0]
+                ) & (dat_bytes[ends[in_range] + 1] == DAT_LINE_END[1])
+                del dat_bytes  # mmapを閉じる前にバッファへの参照を手放す
+
+    # 前のレコードの改行コードの直後から次のレコードが始まっていること
+    expected_offsets = np.empty(len(offsets), dtype=np.int64)
+    if len(offsets):
+        expected_offsets[0] = len(UTF8_BOM)
+        expected_offsets[1:] = ends[:-1] + len(DAT_LINE_END)
+    contiguous = offsets == expected_offsets
+    expected_dat_size = (
+        int(ends[-1]) + len(DAT_LINE_END) if len(offsets) else len(UTF8_BOM)
+    )
+
+    # string_idの照合
+    checked = np.flatnonzero(in_range)
+    string_id_mismatches = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(
+                _find_string_id_mismatches,
+                dat_path,
+                [string_ids[i] for i in checked[start : start + chunk_size]],
+                offsets[checked[start : start + chunk_size]].tolist(),
+            )
+            for start in range(0, len(checked), chunk_size)
+        ]
+        for start, future in zip(range(0, len(checked), chunk_size), futures):
+            string_id_mismatches.extend(
+                int(checked[start + i]) for i in future.result()
+            )
+
+    def describe(indexes):
+        indexes = [int(i) for i in indexes]
+        return {
+            "count": len(indexes),
+            "samples": [
+                {
+                    "index": i,
+                    "string_id": string_ids[i],
+                    "total_byte_size": int(offsets[i]),
+                    "byte_size": int(byte_sizes[i]),
+                }
+                for i in indexes[:MAX_SAMPLES]
+            ],
+        }
+
+    mismatches = {
+        "out_of_range": describe(np.flatnonzero(out_of_range)),
+        "missing_line_end": describe(np.flatnonzero(in_range & ~terminator_ok)),
+        "gap_or_overlap": describe(np.flatnonzero(~contiguous)),
+        "string_id": describe(sorted(string_id_mismatches)),
+    }
+    bom_ok = dat_head == UTF8_BOM
+    size_ok = dat_size == expected_dat_size
+    return {
+        "dat_path": dat_path,
+        "dir_path": dir_path,
+        "entries": len(offsets),
+        "dat_size": dat_size,
+        "expected_dat_size": expected_dat_size,
+        "bom_ok": bom_ok,
+        "size_ok": size_ok,
+        "mismatches": mismatches,
+        "ok": bom_ok
+        and size_ok
+        and all(mismatch["count"] == 0 for mismatch in mismatches.values()),
+    }
@@ -0,0 +1,46 @@
+import numpy as np
+from src.utils.remaining_util import ProgressTracker
+
+DAT_LINE_END = b"\r\n"
+
+
+def dump_dat_dir(dat_master, dir_master, dat_path, dir_path, batch_size=10000):
+    """
+    datとdirを1パスで書き出す。
+    datの各レコードは一度だけエンコードし、実際に書き込んだバイト列の長さから
+    dirのオフセット(total_byte_size)とバイト長(byte_size)を求めるため、dirの値はdatと必ず一致する。
+    dirのi行目にはdatのi行目の値が設定される（DirMaster.update_byte_sizes と同じ対応付け）。
+    :param dat_master: 書き出すDatMaster
+    :param dir_master: オフセットを設定して書き出すDirMaster（string_id, data_typeのテンプレート）
+    :param dat_path: datの出力先パス
+    :param dir_path: dirの出力先パス
+    :param batch_size: 一度に書き込むレコード数
+    """
+    string_ids, string_types, text_bodies = dat_master.get_columns()
+    count = min(len(dir_master.get_master_data()), len(string_ids))
+    byte_sizes = np.zeros(len(string_ids), dtype=np.int64)
+    tracker = ProgressTracker(len(string_ids), description="Dumping dat")
+
+    # to_csvは使用禁止
+    with open(dat_path, "wb") as f:
+        f.write(b"\xef\xbb\xbf")  # UTF-8 BOM
+        for start in range(0, len(string_ids), batch_size):
+            end = min(start + batch_size, len(string_ids))
+            batch = [
+                "\t".join(row).encode("utf-8")
+                for row in zip(
+                    string_ids[start:end],
+                    string_types[start:end],
+                    text_bodies[start:end],
+                )
+            ]
+            byte_sizes[start:end] = [len(line) for line in batch]
+            batch.append(b"")  # joinで最終行の末尾にも改行コードを付与するための番兵
+            f.write(DAT_LINE_END.join(batch))
+            tracker.update(end - start)
+    tracker.finish()
+
+    # 先頭はBOMの3バイトから始まり、各レコードの後ろに改行コードが続く
+    offsets = np.cumsum(byte_sizes + len(DAT_LINE_END)) - byte_sizes - len(DAT_LINE_END) + 3
+    dir_master.set_byte_sizes(offsets[:count], byte_sizes[:count])
+    dir_master.dump_master_data(dir_path)
@@ -1,152 +1,234 @@
-import pandas as pd
+import codecs
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 import src.const.const as const  # 定数読み込み
-from src.utils.file_util import split_line
+from src.master.dat_record_store import DatRecordStore
+from src.utils.file_util import (
+    iter_file_lines,
+    resolve_encoding,
+    split_line,
+    split_line_aligned_ranges,
+    write_lines,
+)
 from src.utils.remaining_util import ProgressTracker
+from src.utils.snapshot_cache import pack_strings, unpack_strings
+
+
+NEW_LINE = "\r\n"
+# 解析結果が変わる修正を入れた場合は上げること（古いスナップショットが使われなくなる）
+DAT_PARSER_VERSION = 1
+# 解析用のプロセスの開始方法。update.pyではシートの取得中のスレッドと並行して解析するため、
+# スレッドが動いているプロセスをforkして子プロセスがデッドロックしないよう、forkは使わない
+PARSER_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _parse_dat_lines(lines, tracker=None, leading=None):
+    """
+    (行, 進捗量) のイテラブルを1パスで解析し、[string_id, string_type, text_bodyの断片リスト] のリストを返す。
+    継続行のtext_bodyは断片のリストに溜めておき、呼び出し側で一度だけ結合する。
+    leadingにリストを渡した場合、最初のレコードより前にある継続行の断片はそこに格納される
+    （ファイル途中から解析するチャンクで、前のチャンクの最終レコードに繋げるため）。
+    """
+    names = const.STRING_TABLE_COLUMNS.column_names()
+    data = []
+
+    for line, progress in lines:
+        if tracker:
+            tracker.update(progress)
+        row = split_line(line, len(names))
+
+        # カラム数がnames以上の場合
+        if len(row) > len(names):
+            print(
+                f"エラー: 不正な形式の行: {line} (期待されるカラム数: {len(names)}, 実際のカラム数: {len(row)})"
+            )
+            continue
+
+        # カラム数が0の場合は空文字が渡ってきた為、直前の行のtext_bodyに改行コードを追加
+        if len(row) == 0 and (data or leading is not None):
+            (data[-1][2] if data else leading).append(NEW_LINE)
+            continue
+
+        # カラム数が1の場合は、前回のtext_bodyの続きである。
+        # 直前の行のtext_bodyに改行コードを追加
+        if len(row) == 1 and (data or leading is not None):
+            parts = data[-1][2] if data else leading
+            parts.append(row[0])
+            parts.append(NEW_LINE)
+            continue
+
+        string_id = row[0]
+        string_type = row[1] if len(row) > 1 else ""
+        # text_bodyが空文字やNoneの場合は空文字として扱う
+        text_body = row[2] if len(row) > 2 and row[2] else ""
+
+        # キーが一緒な場合
+        if data and data[-1][0] == string_id and data[-1][1] == string_type:
+            data[-1][2].append(text_body)
+
+        # キーが違う場合
+        else:
+            # 代入処理
+            data.append([string_id, string_type, [text_body]])
+    return data
+
+
+def _parse_dat_chunk(file_path, start, end, encoding):
+    """
+    プロセスプールで実行されるワーカー。datファイルの [start, end) をencodingでデコードして解析し、
+    (先頭の継続行の断片リスト, (string_id, string_type, text_body) のリスト) を返す。
+    ファイル先頭のチャンクは逐次パーサーと同じく継続行を通常の行として扱う。
+    """
+    leading = None if start == 0 else []
+    data = _parse_dat_lines(
+        iter_file_lines(file_path, encoding, start=start, end=end), leading=leading
+    )
+    return leading, [(record[0], record[1], "".join(record[2])) for record in data]
 
 
 class DatMaster:
     def __init__(self, data_string):
-        self.__data_string = data_string
-        self.__master_data = self.__custom_dat_parser(data_string)
-        self.__create_index()
+        lines = data_string.splitlines() if data_string else []
+        tracker = ProgressTracker(len(lines), description="Parsing dat")
+        data = _parse_dat_lines(((line, 1) for line in lines), tracker)
+        tracker.finish()
+        self.__store = self.__to_store(data)
+
+    @classmethod
+    def from_path(cls, file_path, processes=1, cache=None, encoding=None):
+        """
+        datファイルをメモリマップしてストリーミング解析し、DatMasterを生成する。
+        ファイル全体をデコード済み文字列として保持しないため、read_file_to_string を経由するより省メモリで高速。
+        :param file_path: 解析するdatファイルのパス
+        :param processes: 2以上の場合、ファイルを行境界で分割してプロセスプールで並列に解析する
+        :param cache: SnapshotCache。指定した場合、同じ内容のファイルの解析結果をスナップショットから読み込む
+        :param encoding: datファイルのエンコーディング。Noneの場合は最初に一度だけ判定し、すべてのチャンクで使う
+        """
+        instance = cls("")
+        encoding = resolve_encoding(file_path, encoding)
+        if cache:
+            key = cache.snapshot_key(
+                file_path, f"dat-{codecs.lookup(encoding).name}", DAT_PARSER_VERSION
+            )
+            snapshot = cache.load(key)
+            if snapshot is not None:
+                instance.__store = DatRecordStore(
+                    *(
+                        unpack_strings(snapshot[f"{name}_data"], snapshot[f"{name}_lengths"])
+                        for name in const.STRING_TABLE_COLUMNS.column_names()
+                    )
+                )
+                return instance
 
-    def __custom_dat_parser(self, data_string):
-        if not data_string:
-            return pd.DataFrame(columns=const.STRING_TABLE_COLUMNS.column_names())
+        tracker = ProgressTracker(os.path.getsize(file_path), description="Parsing dat")
+        if processes and processes > 1:
+            data = instance.__parallel_dat_parser(file_path, processes, tracker, encoding)
+        else:
+            data = _parse_dat_lines(iter_file_lines(file_path, encoding), tracker)
+        tracker.finish()
+        instance.__store = instance.__to_store(data)
 
+        if cache:
+            arrays = {}
+            for name, values in zip(
+                const.STRING_TABLE_COLUMNS.column_names(), instance.get_columns()
+            ):
+                arrays[f"{name}_data"], arrays[f"{name}_lengths"] = pack_strings(values)
+            cache.save(key, arrays)
+        return instance
+
+    def __parallel_dat_parser(self, file_path, processes, tracker, encoding):
+        """
+        行境界で分割したバイト範囲をプロセスプールで解析し、逐次パーサーと同じ結果になるよう連結する。
+        チャンク先頭の継続行と、チャンク境界を跨ぐ同一キーの行は直前のチャンクの最終レコードに繋げる。
+        """
+        ranges = split_line_aligned_ranges(file_path, processes)
         data = []
-        names = const.STRING_TABLE_COLUMNS.column_names()
-        tracker = ProgressTracker(
-            len(data_string.splitlines()), description="Parsing dat"
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(ranges) or 1),
+            mp_context=multiprocessing.get_context(PARSER_START_METHOD),
+        ) as executor:
+            futures = [
+                executor.submit(_parse_dat_chunk, file_path, start, end, encoding)
+                for start, end in ranges
+            ]
+            for (start, end), future in zip(ranges, futures):
+                leading, records = future.result()
+                tracker.update(end - start)
+                if leading:
+                    data[-1][2].extend(leading)
+                for string_id, string_type, text_body in records:
+                    if data and data[-1][0] == string_id and data[-1][1] == string_type:
+                        data[-1][2].append(text_body)
+                    else:
+                        data.append([string_id, string_type, [text_body]])
+        return data
+
+    def __to_store(self, data):
+        return DatRecordStore(
+            [record[0] for record in data],
+            [record[1] for record in data],
+            ["".join(record[2]) for record in data],
         )
 
-        new_line = "\r\n"
+    def __to_key(self, string_id, string_type):
+        return (str(string_id), str(string_type))
 
-        for i, line in enumerate(data_string.splitlines()):
-            row = split_line(line, len(names))
-
-            # カラム数がnames以上の場合
-            if len(row) > len(names):
-                print(
-                    f"エラー: 不正な形式の行: {line} (期待されるカラム数: {len(names)}, 実際のカラム数: {len(row)})"
-                )
-                continue
-
-            # カラム数が0の場合は空文字が渡ってきた為、直前の行のtext_bodyに改行コードを追加
-            if len(row) == 0 and data:
-                data[-1][names[2]] += new_line
-                continue
-
-            # カラム数が1の場合は、前回のtext_bodyの続きである。
-            # 直前の行のtext_bodyに改行コードを追加
-            if len(row) == 1 and data:
-                data[-1][names[2]] += row[0] + new_line
-                continue
-
-            # カラム数が2の場合、text_bodyに改行コードを追加
-            if len(row) == 2:
-                # row.extend([new_line] * (len(names) - len(row)))
-                row.extend([""] * (len(names) - len(row)))
-
-            # カラム数が3の場合、改行コードを追加
-            elif len(row) == 3:
-                # row[2] = row[2] + new_line if row[2] and row[2] is not None else new_line
-                pass
-
-            row_dict = dict(zip(names, row))
-
-            # ここまでやって、text_bodyが空文字やNoneの場合は、改行コードを追加
-            if row_dict.get(names[2]) is None or row_dict[names[2]] == "":
-                row_dict[names[2]] = ""
-
-            if len(row_dict) > len(names):
-                print(f"エラー: 不正な形式の行: カラム数が{len(names)}以上です")
-                continue
-
-            # キーが一緒な場合
-            if (
-                data
-                and data[-1][names[0]] == row_dict[names[0]]
-                and data[-1][names[1]] == row_dict[names[1]]
-            ):
-                data[-1][names[2]] += row_dict[names[2]]
-
-            # キーが違う場合
-            else:
-                # 代入処理
-                data.append(row_dict)
-            tracker.update()
-        tracker.finish()
-
-        df = pd.DataFrame(data)
-        for col in names:
-            if col in df.columns:
-                df[col] = df[col].astype(str)
-        return df
-
-    def __create_index(self):
-        if not self.__master_data.empty:
-            self.__master_data.index = (
-                self.__master_data[
-                    [
-                        const.STRING_TABLE_COLUMNS.string_id.value,
-                        const.STRING_TABLE_COLUMNS.string_type.value,
-                    ]
-                ]
-                .astype(str)
-                .agg("-".join, axis=1)
-            )
+    def has_record(self, string_id, string_type):
+        return self.__store.find(*self.__to_key(string_id, string_type)) is not None
 
     def get_record(self, string_id, string_type):
-        key = f"{string_id}-{string_type}"
-        if key not in self.__master_data.index:
+        key = self.__to_key(string_id, string_type)
+        position = self.__store.find(*key)
+        if position is None:
             raise ValueError(f"キーが見つかりません: {key}")
-        return self.__master_data.loc[key]
+        return dict(zip(const.STRING_TABLE_COLUMNS.column_names(), self.__store.get(position)))
 
     def add_record(self, string_id, string_type, text_body):
-        names = const.STRING_TABLE_COLUMNS.column_names()
-        key = f"{string_id}-{string_type}"
-        if key in self.__master_data.index:
+        key = self.__to_key(string_id, string_type)
+        if self.__store.find(*key) is not None:
             raise ValueError(f"キーが重複しています: {key}")
-        new_record = pd.DataFrame(
-            [{names[0]: string_id, names[1]: string_type, names[2]: text_body}]
-        )
-        for col in new_record.columns:
-            new_record[col] = new_record[col].astype(str)
-        self.__master_data = pd.concat(
-            [self.__master_data, new_record], ignore_index=True
-        )
-        self.__create_index()
+        self.__store.append(*key, str(text_body))
 
     def add_records(self, records):
         names = const.STRING_TABLE_COLUMNS.column_names()
-        new_records = pd.DataFrame(records, columns=names)
-        for col in new_records.columns:
-            new_records[col] = new_records[col].astype(str)
-        self.__master_data = pd.concat(
-            [self.__master_data, new_records], ignore_index=True
-        )
-        self.__create_index()
+        for record in records:
+            if isinstance(record, dict):
+                record = [record.get(name, "") for name in names]
+            self.__store.append(*(str(value) for value in record))
 
     def update_record(self, string_id, string_type, new_text_body):
-        names = const.STRING_TABLE_COLUMNS.column_names()
-        key = f"{string_id}-{string_type}"
-        if key not in self.__master_data.index:
+        key = self.__to_key(string_id, string_type)
+        position = self.__store.find(*key)
+        if position is None:
             raise ValueError(f"キーが見つかりません: {key}")
-        self.__master_data.loc[key, names[2]] = new_text_body
+        self.__store.set_text_body(position, str(new_text_body))
 
     def dump_master_data(self, file_path):
-        df = self.__master_data.reset_index()[const.STRING_TABLE_COLUMNS.column_names()]
-        tracker = ProgressTracker(len(df), description="Dumping data")
+        store = self.__store
+        tracker = ProgressTracker(len(store), description="Dumping data")
         # to_csvは使用禁止
         with open(file_path, "wb") as f:
             f.write(b"\xef\xbb\xbf")  # UTF-8 BOM
-            for i, (_, row) in enumerate(df.iterrows()):
-                line = "\t".join(str(x) for x in row)
-                log_line = line.encode("utf-8") + ("\r\n").encode("utf-8")
-                f.write(log_line)
-                tracker.update()
+            write_lines(
+                f,
+                map(
+                    "\t".join,
+                    zip(store.string_ids, store.string_types, store.text_bodies),
+                ),
+                NEW_LINE,
+                tracker=tracker,
+            )
         tracker.finish()
 
     def get_master_data(self):
-        return self.__master_data
+        """レコードをDataFrameとして返す。呼び出しごとに生成されるビューのため、変更はupdate_record等で行うこと"""
+        return self.__store.to_dataframe()
+
+    def get_columns(self):
+        """(string_ids, string_types, text_bodies) の並列リストを返す。読み取り専用として扱うこと"""
+        store = self.__store
+        return store.string_ids, store.string_types, store.text_bodies
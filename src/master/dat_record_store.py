@@ -0,0 +1,59 @@
+import pandas as pd
+import src.const.const as const  # 定数読み込み
+
+
+class DatRecordStore:
+    """
+    datのレコードを列ごとの並列リストで保持するストア。
+    (string_id, string_type) のタプルをキーとしたハッシュインデックスを持ち、
+    キーによる参照・更新をDataFrameを介さずO(1)で行う。
+    """
+
+    __slots__ = ("string_ids", "string_types", "text_bodies", "__index")
+
+    def __init__(self, string_ids=None, string_types=None, text_bodies=None):
+        self.string_ids = list(string_ids) if string_ids is not None else []
+        self.string_types = list(string_types) if string_types is not None else []
+        self.text_bodies = list(text_bodies) if text_bodies is not None else []
+        self.__index = {}
+        for position, key in enumerate(zip(self.string_ids, self.string_types)):
+            # キーが重複している場合は先頭のレコードを優先する
+            self.__index.setdefault(key, position)
+
+    def __len__(self):
+        return len(self.string_ids)
+
+    def find(self, string_id, string_type):
+        """キーに対応するレコードの位置を返す。存在しない場合はNone"""
+        return self.__index.get((string_id, string_type))
+
+    def get(self, position):
+        """指定位置のレコードを (string_id, string_type, text_body) で返す"""
+        return (
+            self.string_ids[position],
+            self.string_types[position],
+            self.text_bodies[position],
+        )
+
+    def set_text_body(self, position, text_body):
+        self.text_bodies[position] = text_body
+
+    def append(self, string_id, string_type, text_body):
+        """レコードを末尾に追加し、その位置を返す"""
+        position = len(self.string_ids)
+        self.string_ids.append(string_id)
+        self.string_types.append(string_type)
+        self.text_bodies.append(text_body)
+        self.__index.setdefault((string_id, string_type), position)
+        return position
+
+    def to_dataframe(self):
+        """保持しているレコードをDataFrameとして返す（呼び出しごとに新しく生成される）"""
+        names = const.STRING_TABLE_COLUMNS.column_names()
+        return pd.DataFrame(
+            {
+                names[0]: pd.Series(self.string_ids, dtype=str),
+                names[1]: pd.Series(self.string_types, dtype=str),
+                names[2]: pd.Series(self.text_bodies, dtype=str),
+            }
+        )
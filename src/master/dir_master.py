@@ -1,20 +1,76 @@
+import codecs
+import numpy as np
 import pandas as pd
 import src.const.const as const  # 定数読み込み
-from src.utils.file_util import split_line
+from src.utils.file_util import read_file_to_string, resolve_encoding, split_line, write_lines
 from src.utils.remaining_util import ProgressTracker
+from src.utils.snapshot_cache import pack_strings, unpack_strings
+
+# 解析結果が変わる修正を入れた場合は上げること（古いスナップショットが使われなくなる）
+DIR_PARSER_VERSION = 1
 
 
 class DirMaster:
     def __init__(self, data_string):
+        # add_record(s)で追加されたレコードはここに溜め、参照時に一度だけDataFrameへ反映する
+        self.__pending_records = []
         if not data_string:
             self.__meta_data = ""
-            self.__master_data = pd.DataFrame(
+            self.__master_data = self.__to_typed_frame(pd.DataFrame(
                 columns=const.UI_TABLE_COLUMNS.column_names()
-            )
+            ))
         else:
             self.__meta_data = self.__parse_meta_data(data_string)
             self.__master_data = self.__custom_dir_parser(data_string)
 
+    @classmethod
+    def from_path(cls, file_path, cache=None, encoding=None):
+        """
+        dirファイルを読み込んでDirMasterを生成する。
+        :param file_path: 解析するdirファイルのパス
+        :param cache: SnapshotCache。指定した場合、同じ内容のファイルの解析結果をスナップショットから読み込む
+        :param encoding: dirファイルのエンコーディング。Noneの場合は detect_encoding で判定する
+        """
+        names = const.UI_TABLE_COLUMNS.column_names()
+        string_columns = [names[0], names[3]]
+        int_columns = [names[1], names[2]]
+        encoding = resolve_encoding(file_path, encoding)
+        if cache:
+            key = cache.snapshot_key(
+                file_path, f"dir-{codecs.lookup(encoding).name}", DIR_PARSER_VERSION
+            )
+            snapshot = cache.load(key)
+            if snapshot is not None:
+                instance = cls("")
+                instance.__meta_data = snapshot["meta_data"].tobytes().decode("utf-8")
+                columns = {
+                    name: unpack_strings(snapshot[f"{name}_data"], snapshot[f"{name}_lengths"])
+                    for name in string_columns
+                }
+                columns.update({name: snapshot[name] for name in int_columns})
+                instance.__master_data = instance.__to_typed_frame(
+                    pd.DataFrame(columns, columns=names)
+                )
+                return instance
+
+        instance = cls(read_file_to_string(file_path, encoding))
+
+        if cache:
+            df = instance.get_master_data()
+            arrays = {
+                "meta_data": np.frombuffer(
+                    instance.get_meta_data().encode("utf-8"), dtype=np.uint8
+                )
+            }
+            for name in string_columns:
+                arrays[f"{name}_data"], arrays[f"{name}_lengths"] = pack_strings(
+                    df[name].tolist()
+                )
+            for name in int_columns:
+                arrays[name] = df[name].to_numpy(dtype=np.int64)
+            cache.save(key, arrays)
+        return instance
+
     def __parse_meta_data(self, data_string):
         meta_lines = []
         for line in data_string.splitlines():
@@ -24,7 +80,9 @@ class DirMaster:
 
     def __custom_dir_parser(self, data_string):
         if not data_string:
-            return pd.DataFrame(columns=const.UI_TABLE_COLUMNS.column_names())
+            return self.__to_typed_frame(
+                pd.DataFrame(columns=const.UI_TABLE_COLUMNS.column_names())
+            )
 
         data = []
         names = const.UI_TABLE_COLUMNS.column_names()
@@ -46,86 +104,132 @@ class DirMaster:
                 data.append(row_dict)
             tracker.update()
         tracker.finish()
-        df = pd.DataFrame(data)
+        df = self.__to_typed_frame(pd.DataFrame(data, columns=names))
         print(df)
         return df
 
+    def __to_typed_frame(self, df):
+        """
+        string_id, data_type は文字列、total_byte_size, byte_size はint64の列に揃える。
+        バイト位置が未確定のレコードは0とする。
+        """
+        for col in [
+            const.UI_TABLE_COLUMNS.total_byte_size.value,
+            const.UI_TABLE_COLUMNS.byte_size.value,
+        ]:
+            df[col] = pd.to_numeric(df[col]).fillna(0).astype(np.int64)
+        for col in [
+            const.UI_TABLE_COLUMNS.string_id.value,
+            const.UI_TABLE_COLUMNS.data_type.value,
+        ]:
+            df[col] = df[col].astype(str)
+        return df
+
     def add_record(self, string_id, data_type):
         names = const.UI_TABLE_COLUMNS.column_names()
-        new_record = pd.DataFrame(
-            [
-                {names[0]: string_id, names[3]: data_type}
-            ],  # byte_size, total_byte_size は後でupdate
-            columns=names,  # カラム順序を保証
-        )
-        for col in new_record.columns:
-            new_record[col] = new_record[col].astype(str)
-        self.__master_data = pd.concat(
-            [self.__master_data, new_record], ignore_index=True
-        )
+        # byte_size, total_byte_size は後でupdate
+        self.__pending_records.append({names[0]: string_id, names[3]: data_type})
 
     def add_records(self, records):
         names = const.UI_TABLE_COLUMNS.column_names()
-        new_records = pd.DataFrame(records, columns=names)
-        for col in new_records.columns:
-            new_records[col] = new_records[col].astype(str)
-        self.__master_data = pd.concat(
-            [self.__master_data, new_records], ignore_index=True
+        for record in records:
+            if not isinstance(record, dict):
+                record = dict(zip(names, record))
+            self.__pending_records.append(record)
+
+    def __flush_pending_records(self):
+        """バッファに溜めたレコードをまとめてDataFrameへ連結する"""
+        if not self.__pending_records:
+            return
+        names = const.UI_TABLE_COLUMNS.column_names()
+        new_records = pd.DataFrame(
+            self.__pending_records, columns=names  # カラム順序を保証
         )
+        self.__pending_records = []
+        new_records = self.__to_typed_frame(new_records)
+        if self.__master_data.empty:
+            self.__master_data = new_records
+        else:
+            self.__master_data = pd.concat(
+                [self.__master_data, new_records], ignore_index=True
+            )
 
     def update_meta(self, meta_string):
         self.__meta_data = meta_string
 
     def update_byte_sizes(self, dat_master):
-        tracker = ProgressTracker(
-            len(self.__master_data), description="Updating byte sizes"
+        """
+        datの各レコードのUTF-8バイト長を列単位でまとめて求め、累積和からオフセットを算出する。
+        dirのi行目にはdatのi行目のオフセットとバイト長が設定される。
+        """
+        self.__flush_pending_records()
+        string_ids, string_types, text_bodies = dat_master.get_columns()
+        count = min(len(self.__master_data), len(string_ids))
+
+        # レコードのバイト長 = 各カラムのバイト長の和 + タブ2つ分
+        byte_sizes = (
+            self.__utf8_lengths(
+                string_id.replace(const.UTF8BOM_START_BYTE, "")
+                for string_id in string_ids[:count]
+            )
+            + self.__utf8_lengths(string_types[:count])
+            + self.__utf8_lengths(text_bodies[:count])
+            + 2
+        )
+        # 先頭は utf-8 BOM の \ufeff に相当する3バイトから始まり、各レコードの後ろに改行コード2バイトが続く
+        offsets = np.empty(count, dtype=np.int64)
+        if count:
+            offsets[0] = 3
+            np.cumsum(byte_sizes[:-1] + 2, out=offsets[1:])
+            offsets[1:] += 3
+
+        self.set_byte_sizes(offsets, byte_sizes)
+
+    def set_byte_sizes(self, total_byte_sizes, byte_sizes):
+        """
+        先頭から順にオフセット(total_byte_size)とバイト長(byte_size)を設定する。
+        渡された配列より後ろの行は変更しない。
+        """
+        self.__flush_pending_records()
+        count = len(byte_sizes)
+        for col, values in [
+            (const.UI_TABLE_COLUMNS.total_byte_size.value, total_byte_sizes),
+            (const.UI_TABLE_COLUMNS.byte_size.value, byte_sizes),
+        ]:
+            column = self.__master_data[col].to_numpy(dtype=np.int64, copy=True)
+            column[:count] = values
+            self.__master_data[col] = column
+
+    def __utf8_lengths(self, values):
+        return np.fromiter(
+            (len(value.encode("utf-8")) for value in values), dtype=np.int64
         )
-
-        start_byte = 3  # 3 は utf-8 BOM の \ufeff に相当するバイト数
-
-        dat_master_data = dat_master.get_master_data()
-        for dir_index, dir_row in self.__master_data.iterrows():
-            if dir_index < len(dat_master_data):
-                dat_row = dat_master_data.iloc[dir_index]
-                text = "\t".join(
-                    [
-                        str(
-                            dat_row[const.STRING_TABLE_COLUMNS.string_id.value]
-                        ).replace(const.UTF8BOM_START_BYTE, "")
-                    ]
-                    + [
-                        str(dat_row[name])
-                        for name in const.STRING_TABLE_COLUMNS.column_names()[1:]
-                    ]
-                )
-                # if text.endswith("\r\n"):
-                #     text = text[:-2]
-                byte_size = len(text.encode("utf-8"))
-
-                self.__master_data.loc[
-                    dir_index, const.UI_TABLE_COLUMNS.total_byte_size.value
-                ] = start_byte
-                self.__master_data.loc[
-                    dir_index, const.UI_TABLE_COLUMNS.byte_size.value
-                ] = byte_size
-
-                start_byte += byte_size + 2  # + 2は改行コードのバイト数
-
-            tracker.update()
-        tracker.finish()
 
     def dump_master_data(self, file_path):
-        df = self.__master_data.reset_index()[const.UI_TABLE_COLUMNS.column_names()]
+        self.__flush_pending_records()
+        df = self.__master_data
         tracker = ProgressTracker(len(df), description="Dumping data")
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.__meta_data + "\n")
-            for _, row in df.iterrows():
-                f.write("\t".join(str(x) for x in row) + "\n")
-                tracker.update()
+        with open(file_path, "wb") as f:
+            f.write((self.__meta_data + "\n").encode("utf-8"))
+            write_lines(
+                f,
+                (
+                    "%s\t%d\t%d\t%s" % row
+                    for row in zip(
+                        df[const.UI_TABLE_COLUMNS.string_id.value],
+                        df[const.UI_TABLE_COLUMNS.total_byte_size.value].tolist(),
+                        df[const.UI_TABLE_COLUMNS.byte_size.value].tolist(),
+                        df[const.UI_TABLE_COLUMNS.data_type.value],
+                    )
+                ),
+                "\n",
+                tracker=tracker,
+            )
         tracker.finish()
 
     def get_master_data(self):
+        self.__flush_pending_records()
         return self.__master_data
 
     def get_meta_data(self):
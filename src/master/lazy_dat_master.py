@@ -0,0 +1,73 @@
+import mmap
+import src.const.const as const  # 定数読み込み
+from src.master.dat_master import _parse_dat_lines
+from src.master.dir_master import DirMaster
+
+
+class LazyDatMaster:
+    """
+    dirのオフセットを使ってdatを遅延読み込みするDatMaster。
+    dirだけを解析してdatはメモリマップしておき、get_recordで要求されたレコードだけを
+    記録されたオフセットからデコードする。数件の文字列を参照するだけの用途向け。
+    """
+
+    def __init__(self, dat_path, dir_path, cache=None):
+        """
+        :param dat_path: datファイルのパス
+        :param dir_path: datに対応するdirファイルのパス
+        :param cache: SnapshotCache。dirの解析結果の読み込みに使用する
+        """
+        dir_data = DirMaster.from_path(dir_path, cache=cache).get_master_data()
+        self.__offsets = dir_data[const.UI_TABLE_COLUMNS.total_byte_size.value].tolist()
+        self.__byte_sizes = dir_data[const.UI_TABLE_COLUMNS.byte_size.value].tolist()
+        # string_idごとのdir行の位置（同じstring_idでstring_typeが異なるレコードがあり得る）
+        self.__positions = {}
+        for position, string_id in enumerate(
+            dir_data[const.UI_TABLE_COLUMNS.string_id.value]
+        ):
+            self.__positions.setdefault(string_id, []).append(position)
+
+        self.__file = open(dat_path, "rb")
+        self.__mm = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.__mm.close()
+        self.__file.close()
+
+    def __read_record(self, position):
+        """dirの指定行が指すバイト範囲をデコードし、DatMasterと同じ規則で解析したレコードを返す"""
+        offset = self.__offsets[position]
+        raw = self.__mm[offset : offset + self.__byte_sizes[position]]
+        lines = raw.decode("utf-8").splitlines()
+        if raw.endswith(b"\n"):
+            # ファイル全体を行に分割した場合と同じく、範囲末尾の改行コードの後ろを空行として扱う
+            # （継続行の規則でtext_body末尾の改行コードが復元される）
+            lines.append("")
+        lines = ((line, 0) for line in lines)
+        data = _parse_dat_lines(lines)
+        if not data:
+            return None
+        string_id, string_type, parts = data[0]
+        return string_id, string_type, "".join(parts)
+
+    def __find(self, string_id, string_type):
+        for position in self.__positions.get(str(string_id), []):
+            record = self.__read_record(position)
+            if record and record[0] == str(string_id) and record[1] == str(string_type):
+                return record
+        return None
+
+    def has_record(self, string_id, string_type):
+        return self.__find(string_id, string_type) is not None
+
+    def get_record(self, string_id, string_type):
+        record = self.__find(string_id, string_type)
+        if record is None:
+            raise ValueError(f"キーが見つかりません: {(str(string_id), str(string_type))}")
+        return dict(zip(const.STRING_TABLE_COLUMNS.column_names(), record))
@@ -0,0 +1,384 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import httplib2
+from googleapiclient.errors import HttpError
+import src.const.const as const  # 定数読み込み
+
+DEFAULT_LOCAL_SHEETS_PATH = ".cache/local_sheets.sqlite3"
+# ローカルのシートに行数の情報は無いため、Googleスプレッドシートの新規シートと同じ行数を最小値とする
+DEFAULT_ROW_COUNT = 1000
+
+# 'シート名'!範囲 または シート名!範囲 の形式のA1表記
+A1_PATTERN = re.compile(r"^(?:'((?:[^']|'')*)'|([^!]*))(?:!(.*))?$")
+CELL_PATTERN = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+class _Request:
+    """googleapiclient の HttpRequest と同じく execute() で実行されるリクエスト"""
+
+    def __init__(self, service, handler, mutates=False):
+        self.service = service
+        self.handler = handler
+        self.mutates = mutates
+
+    def execute(self):
+        if self.service.latency_seconds:
+            time.sleep(self.service.latency_seconds)  # ネットワーク遅延の再現
+        # 1リクエストを1トランザクションとして扱う
+        with self.service.lock, self.service.connection:
+            result = self.handler()
+            if self.mutates:
+                self.service.bump_version()
+            return result
+
+
+class _ValuesResource:
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, spreadsheetId, range, majorDimension="ROWS", valueRenderOption=None):
+        return _Request(self.service, lambda: self.service.read_range(range, majorDimension))
+
+    def batchGet(self, spreadsheetId, ranges, majorDimension="ROWS", valueRenderOption=None):
+        return _Request(
+            self.service,
+            lambda: {
+                "valueRanges": [
+                    self.service.read_range(range_name, majorDimension) for range_name in ranges
+                ]
+            },
+        )
+
+    def update(self, spreadsheetId, range, valueInputOption, body):
+        return _Request(
+            self.service, lambda: self.service.write_range(range, body["values"]), mutates=True
+        )
+
+    def batchUpdate(self, spreadsheetId, body):
+        def handler():
+            for value_range in body["data"]:
+                self.service.write_range(value_range["range"], value_range["values"])
+            return {"totalUpdatedRows": sum(len(v["values"]) for v in body["data"])}
+
+        return _Request(self.service, handler, mutates=True)
+
+    def clear(self, spreadsheetId, range):
+        return _Request(self.service, lambda: self.service.clear_sheet(range), mutates=True)
+
+    def append(self, spreadsheetId, range, valueInputOption, insertDataOption, body):
+        return _Request(
+            self.service, lambda: self.service.append_rows(range, body["values"]), mutates=True
+        )
+
+
+class _SpreadsheetsResource:
+    def __init__(self, service):
+        self.service = service
+
+    def values(self):
+        return _ValuesResource(self.service)
+
+    def get(self, spreadsheetId, fields=None):
+        return _Request(self.service, self.service.get_metadata)
+
+    def batchUpdate(self, spreadsheetId, body):
+        def handler():
+            return {
+                "replies": [
+                    self.service.apply_structure_request(request) for request in body["requests"]
+                ]
+            }
+
+        return _Request(self.service, handler, mutates=True)
+
+
+class _FilesResource:
+    """Drive API v3 の files のうち、ファイルバージョンの取得だけを再現する"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, fileId, fields=None, supportsAllDrives=False):
+        return _Request(self.service, lambda: {"version": str(self.service.get_version())})
+
+
+class LocalSheetsService:
+    """
+    Google Sheets API v4 (と変更マーカー用のDrive API v3 files.get) のうち
+    SheetMaster が使うリソースをSQLiteで再現するローカル実装。
+    ネットワークや認証情報なしで create.py / update.py を実行・計測するために使う。
+    値はすべて文字列として保存し、USER_ENTERED の先頭のシングルクォートは取り除く。
+    """
+
+    def __init__(self, path=DEFAULT_LOCAL_SHEETS_PATH, latency_seconds=0.0):
+        """
+        :param path: データを保存するSQLiteファイルのパス
+        :param latency_seconds: 1リクエストごとに待機する秒数（ネットワーク遅延の再現）
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.latency_seconds = latency_seconds
+        # 別スレッドから順に使われることがあるため、接続をスレッド間で共有してロックで直列化する
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.connection:
+            self.__create_schema()
+
+    @classmethod
+    def from_env(cls):
+        """環境変数 LOCAL_SHEETS_PATH, LOCAL_SHEETS_LATENCY_MS から生成する"""
+        return cls(
+            os.getenv("LOCAL_SHEETS_PATH") or DEFAULT_LOCAL_SHEETS_PATH,
+            float(os.getenv("LOCAL_SHEETS_LATENCY_MS") or 0) / 1000,
+        )
+
+    def __create_schema(self):
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS sheets (sheet_id INTEGER PRIMARY KEY, title TEXT UNIQUE)"
+        )
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            "sheet_id INTEGER, row_index INTEGER, cells TEXT, PRIMARY KEY (sheet_id, row_index))"
+        )
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS protected_ranges ("
+            "protected_range_id INTEGER PRIMARY KEY, sheet_id INTEGER)"
+        )
+        # 変更のたびに増えるバージョン（Driveのファイルバージョンに相当）
+        cursor.execute("CREATE TABLE IF NOT EXISTS revision (version INTEGER)")
+        if cursor.execute("SELECT COUNT(*) FROM revision").fetchone()[0] == 0:
+            cursor.execute("INSERT INTO revision (version) VALUES (1)")
+        if cursor.execute("SELECT COUNT(*) FROM sheets").fetchone()[0] == 0:
+            # 新規作成時は翻訳シート・メタシート・オーダーシートを用意する
+            # メタシートには最新dirのメタ情報と一致しない仮の値を入れ、初回のupdate.pyで全件が書き込まれるようにする
+            initial_rows = {
+                const.TRANSLATE_SHEET_NAME: [const.TRANSLATE_TABLE_COLUMNS.column_names()],
+                const.META_SHEET_NAME: [["-"]],
+                const.ORDER_SHEET_NAME: [],
+            }
+            for title, rows in initial_rows.items():
+                sheet_id = cursor.execute("INSERT INTO sheets (title) VALUES (?)", (title,)).lastrowid
+                for row_index, cells in enumerate(rows):
+                    self.__save_row(sheet_id, row_index, list(cells))
+
+    def spreadsheets(self):
+        return _SpreadsheetsResource(self)
+
+    def files(self):
+        return _FilesResource(self)
+
+    def get_version(self):
+        return self.connection.execute("SELECT version FROM revision").fetchone()[0]
+
+    def bump_version(self):
+        self.connection.execute("UPDATE revision SET version = version + 1")
+
+    # ---- 範囲の解析 ----
+
+    def __error(self, status, message):
+        return HttpError(httplib2.Response({"status": status}), message.encode("utf-8"))
+
+    def __sheet_id(self, title):
+        row = self.connection.execute(
+            "SELECT sheet_id FROM sheets WHERE title = ?", (title,)
+        ).fetchone()
+        if row is None:
+            raise self.__error(400, f"Unable to parse range: {title}")
+        return row[0]
+
+    def __parse_range(self, range_name):
+        """A1表記を (シートID, 開始行, 終了行, 開始列, 終了列) に変換する（0始まり、終了は含まない、Noneは無制限）"""
+        match = A1_PATTERN.match(range_name)
+        title = match.group(1).replace("''", "'") if match.group(1) is not None else match.group(2)
+        sheet_id = self.__sheet_id(title)
+        if not match.group(3):
+            return sheet_id, 0, None, 0, None
+        parts = match.group(3).split(":")
+        start = CELL_PATTERN.match(parts[0])
+        end = CELL_PATTERN.match(parts[-1])
+        if start is None or end is None:
+            raise self.__error(400, f"Unable to parse range: {range_name}")
+        start_column = self.__column_index(start.group(1)) if start.group(1) else 0
+        start_row = int(start.group(2)) - 1 if start.group(2) else 0
+        end_column = self.__column_index(end.group(1)) + 1 if end.group(1) else None
+        end_row = int(end.group(2)) if end.group(2) else None
+        return sheet_id, start_row, end_row, start_column, end_column
+
+    @staticmethod
+    def __column_index(letters):
+        index = 0
+        for letter in letters.upper():
+            index = index * 26 + ord(letter) - ord("A") + 1
+        return index - 1
+
+    def __load_rows(self, sheet_id, start_row=0, end_row=None):
+        query = "SELECT row_index, cells FROM rows WHERE sheet_id = ? AND row_index >= ?"
+        params = [sheet_id, start_row]
+        if end_row is not None:
+            query += " AND row_index < ?"
+            params.append(end_row)
+        return {
+            row_index: json.loads(cells)
+            for row_index, cells in self.connection.execute(query + " ORDER BY row_index", params)
+        }
+
+    def __save_row(self, sheet_id, row_index, cells):
+        while cells and cells[-1] == "":
+            cells.pop()
+        if cells:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO rows (sheet_id, row_index, cells) VALUES (?, ?, ?)",
+                (sheet_id, row_index, json.dumps(cells, ensure_ascii=False)),
+            )
+        else:
+            self.connection.execute(
+                "DELETE FROM rows WHERE sheet_id = ? AND row_index = ?", (sheet_id, row_index)
+            )
+
+    def __last_row(self, sheet_id):
+        row = self.connection.execute(
+            "SELECT MAX(row_index) FROM rows WHERE sheet_id = ?", (sheet_id,)
+        ).fetchone()
+        return -1 if row[0] is None else row[0]
+
+    @staticmethod
+    def __entered_value(value):
+        """USER_ENTERED と同様に、先頭のシングルクォートを文字列指定として取り除く"""
+        if value is None:
+            return ""
+        value = str(value)
+        return value[1:] if value.startswith("'") else value
+
+    # ---- values ----
+
+    def read_range(self, range_name, major_dimension="ROWS"):
+        sheet_id, start_row, end_row, start_column, end_column = self.__parse_range(range_name)
+        stored = self.__load_rows(sheet_id, start_row, end_row)
+        last_row = max(stored, default=start_row - 1)
+        rows = []
+        for row_index in range(start_row, last_row + 1):
+            cells = stored.get(row_index, [])
+            rows.append(cells[start_column:end_column])
+        values = rows
+        if major_dimension == "COLUMNS":
+            width = max((len(row) for row in rows), default=0)
+            values = [
+                [row[column] if column < len(row) else "" for row in rows]
+                for column in range(width)
+            ]
+            for column in values:
+                while column and column[-1] == "":
+                    column.pop()
+        while values and not values[-1]:
+            values.pop()
+        result = {"range": range_name, "majorDimension": major_dimension}
+        if values:
+            result["values"] = values
+        return result
+
+    def write_range(self, range_name, values):
+        sheet_id, start_row, _, start_column, _ = self.__parse_range(range_name)
+        stored = self.__load_rows(sheet_id, start_row, start_row + len(values))
+        for offset, new_cells in enumerate(values):
+            row_index = start_row + offset
+            cells = stored.get(row_index, [])
+            cells.extend([""] * (start_column + len(new_cells) - len(cells)))
+            cells[start_column : start_column + len(new_cells)] = [
+                self.__entered_value(value) for value in new_cells
+            ]
+            self.__save_row(sheet_id, row_index, cells)
+        return {"updatedRange": range_name, "updatedRows": len(values)}
+
+    def append_rows(self, range_name, values):
+        sheet_id = self.__parse_range(range_name)[0]
+        start_row = self.__last_row(sheet_id) + 1
+        for offset, cells in enumerate(values):
+            self.__save_row(
+                sheet_id, start_row + offset, [self.__entered_value(value) for value in cells]
+            )
+        return {"updates": {"updatedRows": len(values)}}
+
+    def clear_sheet(self, range_name):
+        sheet_id = self.__parse_range(range_name)[0]
+        self.connection.execute("DELETE FROM rows WHERE sheet_id = ?", (sheet_id,))
+        return {"clearedRange": range_name}
+
+    # ---- spreadsheets ----
+
+    def get_metadata(self):
+        sheets = []
+        for sheet_id, title in self.connection.execute(
+            "SELECT sheet_id, title FROM sheets ORDER BY sheet_id"
+        ).fetchall():
+            protected_ranges = [
+                {"protectedRangeId": row[0]}
+                for row in self.connection.execute(
+                    "SELECT protected_range_id FROM protected_ranges WHERE sheet_id = ?",
+                    (sheet_id,),
+                )
+            ]
+            sheet = {
+                "properties": {
+                    "sheetId": sheet_id,
+                    "title": title,
+                    "gridProperties": {
+                        "rowCount": max(DEFAULT_ROW_COUNT, self.__last_row(sheet_id) + 1)
+                    },
+                }
+            }
+            if protected_ranges:
+                sheet["protectedRanges"] = protected_ranges
+            sheets.append(sheet)
+        return {"sheets": sheets}
+
+    def apply_structure_request(self, request):
+        if "addSheet" in request:
+            title = request["addSheet"]["properties"]["title"]
+            cursor = self.connection.execute("INSERT INTO sheets (title) VALUES (?)", (title,))
+            return {"addSheet": {"properties": {"sheetId": cursor.lastrowid, "title": title}}}
+        if "addProtectedRange" in request:
+            sheet_id = request["addProtectedRange"]["protectedRange"]["range"]["sheetId"]
+            cursor = self.connection.execute(
+                "INSERT INTO protected_ranges (sheet_id) VALUES (?)", (sheet_id,)
+            )
+            return {"addProtectedRange": {"protectedRange": {"protectedRangeId": cursor.lastrowid}}}
+        if "deleteProtectedRange" in request:
+            self.connection.execute(
+                "DELETE FROM protected_ranges WHERE protected_range_id = ?",
+                (request["deleteProtectedRange"]["protectedRangeId"],),
+            )
+            return {}
+        if "deleteDimension" in request or "insertDimension" in request:
+            deleting = "deleteDimension" in request
+            dimension_range = request["deleteDimension" if deleting else "insertDimension"]["range"]
+            if dimension_range["dimension"] != "ROWS":
+                raise self.__error(400, "Only ROWS dimension is supported.")
+            sheet_id = dimension_range["sheetId"]
+            start, end = dimension_range["startIndex"], dimension_range["endIndex"]
+            if deleting:
+                self.connection.execute(
+                    "DELETE FROM rows WHERE sheet_id = ? AND row_index >= ? AND row_index < ?",
+                    (sheet_id, start, end),
+                )
+                self.__shift_rows(sheet_id, end, start - end)
+            else:
+                self.__shift_rows(sheet_id, start, end - start)
+            return {}
+        raise self.__error(400, f"Unsupported request: {list(request)}")
+
+    def __shift_rows(self, sheet_id, from_row, delta):
+        """from_row行目以降の行をdelta行ずらす（主キーの衝突を避けるため一度負の値を経由する）"""
+        self.connection.execute(
+            "UPDATE rows SET row_index = -(row_index + ?) - 1 WHERE sheet_id = ? AND row_index >= ?",
+            (delta, sheet_id, from_row),
+        )
+        self.connection.execute(
+            "UPDATE rows SET row_index = -row_index - 1 WHERE sheet_id = ? AND row_index < 0",
+            (sheet_id,),
+        )
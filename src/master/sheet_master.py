@@ -1,51 +1,208 @@
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import google.auth
+import google_auth_httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 from google.oauth2 import service_account
+import pandas as pd
+from src.master.local_sheets_service import LocalSheetsService
+from src.utils.retry_util import TokenBucket, execute_with_retry
+from src.utils.sheet_delta_util import compute_row_delta, row_keys, to_runs
+
+# Sheets API の書き込みリクエストの1分あたりの上限（ユーザーごとのデフォルトクォータ）
+WRITE_REQUESTS_PER_MINUTE = 60
+# 書き込みリクエストを連続で送信できる最大数
+WRITE_BURST = 10
+# 認証のスコープ（Driveはシートのミラーの変更マーカーとしてファイルのバージョンを読むために使う）
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
+# スプレッドシートのメタデータとして取得する項目
+METADATA_FIELDS = (
+    "sheets(properties(sheetId,title,gridProperties(rowCount)),"
+    "protectedRanges(protectedRangeId))"
+)
+
+
+def columns_to_dataframe(columns):
+    """
+    SheetMaster.get_sheets_data が返す列優先の値（各列の先頭がヘッダー）をDataFrameに変換する。
+    """
+    return pd.DataFrame({column[0]: column[1:] for column in columns})
 
 
 class SheetMaster:
-    def __init__(self, credentials_path, spreadsheet_id, admin_email=None):
+    def __init__(
+        self,
+        credentials_path,
+        spreadsheet_id,
+        admin_email=None,
+        write_requests_per_minute=WRITE_REQUESTS_PER_MINUTE,
+        mirror=None,
+    ):
         """
         :param spreadsheet_id: 操作対象のスプレッドシートID
         :param admin_email: 管理者のメールアドレス
         :param credentials_path: ローカル実行時に利用するサービスアカウント認証ファイルのパス
+        :param write_requests_per_minute: 分割書き込みで1分あたりに送信する書き込みリクエストの上限
+        :param mirror: SheetMirror。指定した場合、スプレッドシートが変更されていなければ取得済みの値を再利用する
         """
         self.spreadsheet_id = spreadsheet_id
         self.admin_email = admin_email
         self.credentials_path = credentials_path  # ローカル用の認証ファイルパス
         self.protected_sheets = {}  # 保護されたシート名とIDの辞書
+        self._credentials = None  # _get_credentials のキャッシュ（アクセストークンも保持する）
+        self._credentials_loaded = False
+        self._credentials_lock = threading.Lock()
+        self._thread_local = threading.local()  # 並列リクエスト用のスレッドごとのサービス
         self.service = self._get_sheets_service()
+        self._thread_local.service = self.service  # 生成したスレッドではこのサービスをそのまま使う
+        self.write_bucket = TokenBucket(write_requests_per_minute, WRITE_BURST)
+        self.last_write_stats = []  # 直近の update_sheet_chunked のチャンクごとの所要時間と再試行回数
+        self._metadata = None  # _get_metadata のキャッシュ
+        self.mirror = mirror
 
     def _get_credentials(self):
+        """
+        認証情報を返す。初回だけ読み込み、以降はSheetMaster内のすべてのサービスで同じインスタンスを共有する。
+        取得済みのアクセストークンも共有されるため、スレッドやAPIごとにトークンを取得し直すことはない。
+        """
+        with self._credentials_lock:
+            if not self._credentials_loaded:
+                self._credentials = self._load_credentials()
+                self._credentials_loaded = True
+            return self._credentials
+
+    def _refresh_credentials(self):
+        """
+        アクセストークンが未取得、期限切れ、または期限間近（google-authの既定で残り3分45秒未満）であれば更新する。
+        並列リクエストを始める前に呼び、各スレッドが同時にトークンを更新しないようにする。
+        """
+        creds = self._get_credentials()
+        if creds is None:
+            return
+        with self._credentials_lock:
+            if not creds.valid:
+                creds.refresh(google_auth_httplib2.Request(build_http()))
+
+    def _load_credentials(self):
         """
         環境変数 "CI" の値により認証方法を切り替え
           - CI環境の場合: google.auth.default() を利用（Workload Identity Federation経由）
           - ローカルの場合: credentials_path から認証ファイルを読み込む
         """
         creds = None
+        if self._uses_local_backend():
+            # ローカルのバックエンドは認証不要
+            return creds
         if os.environ.get("CI", "").lower() == "true":
             # CI環境（例: GitHub Actions で Workload Identity Federation がセットアップ済みの場合）
-            creds, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/spreadsheets"])
+            creds, _ = google.auth.default(scopes=SCOPES)
         else:
             if os.path.exists(self.credentials_path):
                 creds = service_account.Credentials.from_service_account_file(
                     self.credentials_path,
-                    scopes=["https://www.googleapis.com/auth/spreadsheets"],
+                    scopes=SCOPES,
                 )
         return creds
 
+    @staticmethod
+    def _uses_local_backend():
+        """
+        環境変数 "SHEETS_BACKEND" が "local" の場合は、Google Sheets API の代わりに
+        ローカルのSQLiteファイルを使う（ネットワークなしでの実行・計測用）
+        """
+        return os.environ.get("SHEETS_BACKEND", "").lower() == "local"
+
+    def _build_service(self, api_name, api_version):
+        """
+        共有の認証情報で認可したHTTPクライアントを使ってAPIのサービスを生成する。
+        HTTPクライアントはサービスごとに持ち、同じサービスを使い回す限りTLS接続はKeep-Aliveで再利用される。
+        （レスポンスのgzip圧縮は googleapiclient が既定で要求する）
+        """
+        creds = self._get_credentials()
+        if creds is None:
+            return build(api_name, api_version, credentials=creds)
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=build_http())
+        return build(api_name, api_version, http=http, cache_discovery=False)
+
     def _get_sheets_service(self):
+        if self._uses_local_backend():
+            return LocalSheetsService.from_env()
         try:
-            creds = self._get_credentials()
-            service = build("sheets", "v4", credentials=creds)
-            return service
+            return self._build_service("sheets", "v4")
         except HttpError as error:
             print(f"An error occurred: {error}")
             print(f"Details: {error.content}")
             return None
 
+    def _get_change_marker(self):
+        """
+        スプレッドシートの変更マーカーとしてDriveのファイルバージョンを取得する。
+        バージョンは誰がどのシートを編集しても増えるため、翻訳者による手動の編集も検知できる。
+        取得できない場合（Drive APIが無効な場合など）はNoneを返し、ミラーは使わない。
+        """
+        try:
+            result = (
+                self._get_thread_drive_service()
+                .files()
+                .get(fileId=self.spreadsheet_id, fields="version", supportsAllDrives=True)
+                .execute()
+            )
+            return result.get("version")
+        except HttpError as error:
+            print(f"Warning: 変更マーカーを取得できないため、シートのミラーを使用しません: {error}")
+            return None
+
+    def _read_through_mirror(self, request_key, fetch):
+        """
+        ミラーに現在の変更マーカーで保存された値があればそれを返し、無ければfetch()で取得して保存する。
+        マーカーは取得の前に読むため、取得中に編集された場合も次回の実行で取得し直される。
+        fetch()がNoneを返した場合（取得を中止した場合）は保存しない。
+        """
+        # 複数のシートを並行して取得する場合に、各スレッドが同時にトークンを更新しないようにする
+        self._refresh_credentials()
+        if not self.mirror:
+            return fetch()
+        marker = self._get_change_marker()
+        values = self.mirror.load(self.spreadsheet_id, request_key, marker)
+        if values is not None:
+            print(f"シートのミラーを使用します (version {marker})")
+            return values
+        values = fetch()
+        if values is not None:
+            self.mirror.save(self.spreadsheet_id, request_key, marker, values)
+        return values
+
+    def _get_thread_service(self):
+        """
+        呼び出し元スレッド専用のサービスを返す。
+        httplib2のHttpはスレッドセーフではないため、並列リクエストではスレッドごとにサービスを生成して使い回す。
+        認証情報はすべてのスレッドで共有する。
+        """
+        service = getattr(self._thread_local, "service", None)
+        if service is None:
+            service = self._get_sheets_service()
+            self._thread_local.service = service
+        return service
+
+    def _get_thread_drive_service(self):
+        """呼び出し元スレッド専用の、変更マーカーの取得に使うDriveのサービスを返す"""
+        drive_service = getattr(self._thread_local, "drive_service", None)
+        if drive_service is None:
+            if self._uses_local_backend():
+                drive_service = LocalSheetsService.from_env()
+            else:
+                drive_service = self._build_service("drive", "v3")
+            self._thread_local.drive_service = drive_service
+        return drive_service
+
     def protect_sheet(self, sheet_name):
         """シートを保護する"""
         if not self.service:
@@ -94,6 +251,7 @@ class SheetMaster:
                 .batchUpdate(spreadsheetId=self.spreadsheet_id, body=body)
                 .execute()
             )
+            self._invalidate_metadata()  # 保護範囲が変わったため
             # 保護されたシートの情報を保存
             self.protected_sheets[sheet_name] = sheet_id
             print(f"Sheet '{sheet_name}' protected successfully.")
@@ -132,6 +290,7 @@ class SheetMaster:
                 .batchUpdate(spreadsheetId=self.spreadsheet_id, body=body)
                 .execute()
             )
+            self._invalidate_metadata()  # 保護範囲が変わったため
             # 保護されたシートの情報を削除
             if sheet_name in self.protected_sheets:
                 del self.protected_sheets[sheet_name]
@@ -141,16 +300,30 @@ class SheetMaster:
             print(f"An error occurred: {error}")
             return None
 
-    def _get_sheet_id(self, sheet_name):
-        """シート名からシートIDを取得する"""
-        try:
+    def _get_metadata(self):
+        """
+        シートのタイトル・ID・行数・保護範囲IDを返す。
+        fieldsで必要な項目だけに絞った1リクエストで取得してキャッシュし、
+        シートの構成を変更する操作の後は _invalidate_metadata で破棄する。
+        """
+        if self._metadata is None:
+            # 並行して取得するシートから呼ばれることがあるため、スレッドごとのサービスを使う
             spreadsheet = (
-                self.service.spreadsheets()
-                .get(spreadsheetId=self.spreadsheet_id)
+                self._get_thread_service()
+                .spreadsheets()
+                .get(spreadsheetId=self.spreadsheet_id, fields=METADATA_FIELDS)
                 .execute()
             )
-            sheets = spreadsheet.get("sheets", [])
-            for sheet in sheets:
+            self._metadata = spreadsheet.get("sheets", [])
+        return self._metadata
+
+    def _invalidate_metadata(self):
+        self._metadata = None
+
+    def _get_sheet_id(self, sheet_name):
+        """シート名からシートIDを取得する"""
+        try:
+            for sheet in self._get_metadata():
                 if sheet["properties"]["title"] == sheet_name:
                     return sheet["properties"]["sheetId"]
             return None
@@ -161,13 +334,7 @@ class SheetMaster:
     def _get_protection_id(self, sheet_id):
         """シートIDから保護設定IDを取得する"""
         try:
-            spreadsheet = (
-                self.service.spreadsheets()
-                .get(spreadsheetId=self.spreadsheet_id)
-                .execute()
-            )
-            sheets = spreadsheet.get("sheets", [])
-            for sheet in sheets:
+            for sheet in self._get_metadata():
                 if sheet["properties"]["sheetId"] == sheet_id:
                     for protected_range in sheet.get("protectedRanges", []):
                         return protected_range["protectedRangeId"]
@@ -202,12 +369,208 @@ class SheetMaster:
                 )
                 .execute()
             )
+            self._invalidate_metadata()  # 書き込みで行数が増えている可能性があるため
             print(f"{sheet_name} sheet updated successfully.")
             return result
         except HttpError as error:
             print(f"An error occurred: {error}")
             return None
 
+    def update_sheet_chunked(self, sheet_name, data, chunk_rows=5000, max_workers=4):
+        """
+        データを行範囲のチャンクに分割し、スレッドプールから並列にシートへ書き込む。
+        送信はトークンバケットで1分あたりの書き込みクォータ内に抑え、
+        429や5xxなどの一時的なエラーはジッター付きの指数バックオフで再試行する。
+        チャンクごとの所要時間と再試行回数は last_write_stats に格納される。
+        :param sheet_name: シート名
+        :param data: A1セルから書き込む行のリスト
+        :param chunk_rows: 1リクエストで書き込む行数
+        :param max_workers: 同時に実行するリクエスト数
+        :return: 成功した場合はチャンクごとの統計のリスト、失敗した場合はNone
+        """
+        if not self.service:
+            print("Error: Google Sheets service not initialized.")
+            return
+
+        # シートが保護されているか確認
+        if sheet_name in self.protected_sheets:
+            # 管理者権限があるか確認
+            if not self.admin_email or not self.is_admin():
+                print(f"Error: Sheet '{sheet_name}' is protected. Only administrators can update it.")
+                return None
+
+        chunks = [
+            (start, data[start : start + chunk_rows])
+            for start in range(0, len(data), chunk_rows)
+        ]
+        try:
+            self._refresh_credentials()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                stats = list(
+                    executor.map(lambda chunk: self._write_chunk(sheet_name, *chunk), chunks)
+                )
+        except HttpError as error:
+            print(f"An error occurred: {error}")
+            return None
+        finally:
+            self._invalidate_metadata()  # 書き込みで行数が増えている可能性があるため
+        self.last_write_stats = stats
+        print(
+            f"{sheet_name} sheet updated successfully. "
+            f"({len(stats)} chunks, {sum(stat['retries'] for stat in stats)} retries)"
+        )
+        return stats
+
+    def sync_sheet_rows(self, sheet_name, old_rows, new_rows, key_count, max_changed_ratio=0.5):
+        """
+        シートの内容(old_rows)とnew_rowsの差分だけを書き込み、シートをnew_rowsと同じ内容にする。
+        行の削除・挿入は spreadsheets.batchUpdate の1リクエストで行い、
+        挿入した行と変更された行の値は values.batchUpdate (USER_ENTERED) の1リクエストで書き込む。
+        シートをクリアしないため、更新中にシートが空になることはない。
+        :param sheet_name: シート名
+        :param old_rows: シートから読み込んだ行のリスト（ヘッダー行を含む、シート上の並び順）
+        :param new_rows: 書き込みたい行のリスト（ヘッダー行を含む）
+        :param key_count: 行の対応付けに使う先頭の列数
+        :param max_changed_ratio: 書き込む行がnew_rowsのこの割合を超える場合は差分同期を行わない
+        :return: 同期できた場合はTrue。差分で表せない場合や失敗した場合はFalse（全体の書き直しが必要）
+        """
+        if not self.service:
+            print("Error: Google Sheets service not initialized.")
+            return False
+
+        # シートが保護されているか確認
+        if sheet_name in self.protected_sheets:
+            # 管理者権限があるか確認
+            if not self.admin_email or not self.is_admin():
+                print(f"Error: Sheet '{sheet_name}' is protected. Only administrators can update it.")
+                return False
+
+        delta = compute_row_delta(old_rows, new_rows, key_count)
+        if delta is None:
+            print(f"{sheet_name}: キーの重複または並び順の変更があるため差分同期できません")
+            return False
+        written_rows = sorted(delta["inserted"] + delta["changed"])
+        print(
+            f"{sheet_name}: 削除 {len(delta['deleted'])} 行, 挿入 {len(delta['inserted'])} 行, "
+            f"変更 {len(delta['changed'])} 行"
+        )
+        if not delta["deleted"] and not written_rows:
+            return True
+        if len(written_rows) > len(new_rows) * max_changed_ratio:
+            print(f"{sheet_name}: 変更行が多いため差分同期を行いません")
+            return False
+
+        try:
+            # 行番号はold_rowsを読み込んだ時点のものなので、その後に翻訳者が行を並べ替え・挿入・削除していれば
+            # 別の行を書き換えてしまう。書き込む直前にキーの列を読み直し、変わっていれば差分同期を行わない
+            if not self._keys_unchanged(sheet_name, old_rows, key_count):
+                print(f"{sheet_name}: 読み込み後にシートの行が変更されたため差分同期を行いません")
+                return False
+
+            structure_requests = []
+            if delta["deleted"] or delta["inserted"]:
+                sheet_id = self._get_sheet_id(sheet_name)
+                if sheet_id is None:
+                    print(f"Sheet '{sheet_name}' not found.")
+                    return False
+                # 削除は下の行から行い、挿入は上の行から行うことで、各リクエスト時点の行番号がずれないようにする
+                for start, end in reversed(to_runs(delta["deleted"])):
+                    structure_requests.append(
+                        {
+                            "deleteDimension": {
+                                "range": {
+                                    "sheetId": sheet_id,
+                                    "dimension": "ROWS",
+                                    "startIndex": start,
+                                    "endIndex": end,
+                                }
+                            }
+                        }
+                    )
+                for start, end in to_runs(delta["inserted"]):
+                    structure_requests.append(
+                        {
+                            "insertDimension": {
+                                "range": {
+                                    "sheetId": sheet_id,
+                                    "dimension": "ROWS",
+                                    "startIndex": start,
+                                    "endIndex": end,
+                                },
+                                "inheritFromBefore": start > 0,
+                            }
+                        }
+                    )
+                execute_with_retry(
+                    lambda: self.service.spreadsheets().batchUpdate(
+                        spreadsheetId=self.spreadsheet_id,
+                        body={"requests": structure_requests},
+                    ),
+                    bucket=self.write_bucket,
+                    # 行の削除・挿入は冪等でないため、適用済みのリクエストを再送して二重に適用しないようにする
+                    idempotent=False,
+                )
+
+            if written_rows:
+                quoted_name = self._quote_sheet_name(sheet_name)
+                data = [
+                    {"range": f"{quoted_name}!A{start + 1}", "values": new_rows[start:end]}
+                    for start, end in to_runs(written_rows)
+                ]
+                execute_with_retry(
+                    lambda: self.service.spreadsheets()
+                    .values()
+                    .batchUpdate(
+                        spreadsheetId=self.spreadsheet_id,
+                        body={"valueInputOption": "USER_ENTERED", "data": data},
+                    ),
+                    bucket=self.write_bucket,
+                )
+        except HttpError as error:
+            print(f"An error occurred: {error}")
+            return False
+        finally:
+            self._invalidate_metadata()  # 行の削除・挿入で行数が変わっているため
+        print(f"{sheet_name} sheet synchronized successfully.")
+        return True
+
+    def _keys_unchanged(self, sheet_name, old_rows, key_count):
+        """シートの先頭key_count列を読み直し、old_rowsのキーと同じ並びであればTrueを返す"""
+        last_column = self._column_letter(key_count - 1)
+        result = (
+            self.service.spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{self._quote_sheet_name(sheet_name)}!A:{last_column}",
+            )
+            .execute()
+        )
+        return row_keys(result.get("values", []), key_count) == row_keys(old_rows, key_count)
+
+    def _write_chunk(self, sheet_name, start, rows):
+        """start行目(0始まり)から rows を書き込み、所要時間と再試行回数を返す（スレッドプールから呼ばれる）"""
+        range_name = f"{self._quote_sheet_name(sheet_name)}!A{start + 1}"
+        started_at = time.monotonic()
+        _, retries = execute_with_retry(
+            lambda: self._get_thread_service()
+            .spreadsheets()
+            .values()
+            .update(
+                spreadsheetId=self.spreadsheet_id,
+                range=range_name,
+                valueInputOption="USER_ENTERED",
+                body={"values": rows},
+            ),
+            bucket=self.write_bucket,
+        )
+        return {
+            "range": range_name,
+            "rows": len(rows),
+            "seconds": time.monotonic() - started_at,
+            "retries": retries,
+        }
+
     def clear_sheet(self, sheet_name):
         """シートをクリアする"""
         if not self.service:
@@ -242,17 +605,219 @@ class SheetMaster:
             return None
 
         try:
-            result = (
-                self.service.spreadsheets()
+            return self._read_through_mirror(
+                ["values", sheet_name],
+                lambda: self._get_thread_service()
+                .spreadsheets()
                 .values()
                 .get(spreadsheetId=self.spreadsheet_id, range=sheet_name)
                 .execute()
+                .get("values", []),
             )
-            return result.get("values", [])
         except HttpError as error:
             print(f"An error occurred: {error}")
             return None
 
+    def iter_sheet_windows(self, sheet_name, window_rows=20000, max_workers=4, cancel_event=None):
+        """
+        シートを行範囲のウィンドウに分割してスレッドプールで並列に取得し、先頭から順に行のリストをyieldする。
+        取得中のウィンドウはmax_workersの2倍までに抑える。
+        yieldされた行を連結すると get_sheet_data と同じ結果になる
+        （ウィンドウ末尾の空行は、後続のウィンドウにデータがある場合だけ補われる）。
+        取得に失敗した場合はHttpErrorを送出する。
+        :param sheet_name: シート名
+        :param window_rows: 1ウィンドウの行数
+        :param max_workers: 同時に実行するリクエスト数
+        :param cancel_event: threading.Event。セットされると、以降のウィンドウを取得せずに終了する
+        """
+        row_count = self._get_row_count(sheet_name)
+        if not row_count:
+            return
+        self._refresh_credentials()
+        windows = deque(
+            (start, min(start + window_rows - 1, row_count))
+            for start in range(1, row_count + 1, window_rows)
+        )
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        def fetch_window(start, end):
+            # 待機中に中止された場合は、リクエストを送信しない
+            if cancel_event is not None and cancel_event.is_set():
+                return []
+            return self._fetch_window(sheet_name, start, end)
+
+        try:
+            in_flight = deque()
+            pending_blank_rows = 0
+            while windows or in_flight:
+                if cancel_event is not None and cancel_event.is_set():
+                    return  # 未送信のウィンドウはfinallyで取り消す
+                while windows and len(in_flight) < max_workers * 2:
+                    start, end = windows.popleft()
+                    in_flight.append(
+                        (start, end, executor.submit(fetch_window, start, end))
+                    )
+                start, end, future = in_flight.popleft()
+                rows = future.result()
+                if rows:
+                    yield [[] for _ in range(pending_blank_rows)] + rows
+                    pending_blank_rows = 0
+                pending_blank_rows += (end - start + 1) - len(rows)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_sheet_data_windowed(self, sheet_name, window_rows=20000, max_workers=4):
+        """iter_sheet_windows で並列に取得したシートのデータを連結して返す"""
+        if not self.service:
+            print("Error: Google Sheets service not initialized.")
+            return None
+        try:
+            values = []
+            for rows in self.iter_sheet_windows(sheet_name, window_rows, max_workers):
+                values.extend(rows)
+            return values
+        except HttpError as error:
+            print(f"An error occurred: {error}")
+            return None
+
+    def get_sheet_dataframe_windowed(
+        self, sheet_name, window_rows=20000, max_workers=4, cancel_event=None
+    ):
+        """
+        iter_sheet_windows で並列に取得しながら、届いたウィンドウから順にDataFrameへ変換する。
+        1行目をヘッダーとして扱い、(ヘッダーのリスト, DataFrame) を返す。
+        取得に失敗した場合や、cancel_event がセットされて取得を中止した場合はNone。
+        """
+        if not self.service:
+            print("Error: Google Sheets service not initialized.")
+            return None
+        header = None
+        frames = []
+
+        def fetch():
+            # ミラーに保存するため、DataFrameへの変換と並行して取得した行も残す
+            nonlocal header
+            values = []
+            for rows in self.iter_sheet_windows(
+                sheet_name, window_rows, max_workers, cancel_event
+            ):
+                values.extend(rows)
+                if header is None:
+                    header, rows = rows[0], rows[1:]
+                frames.append(pd.DataFrame(rows, columns=header))
+            if cancel_event is not None and cancel_event.is_set():
+                return None  # 途中までの値はミラーに保存しない
+            return values
+
+        try:
+            # get_sheet_data と同じ結果になるため、ミラーのエントリも共有する
+            values = self._read_through_mirror(["values", sheet_name], fetch)
+        except HttpError as error:
+            print(f"An error occurred: {error}")
+            return None
+        if not values:
+            return None
+        if not frames:  # ミラーから読み込んだ場合
+            header = values[0]
+            frames.append(pd.DataFrame(values[1:], columns=header))
+        return header, pd.concat(frames, ignore_index=True)
+
+    def _fetch_window(self, sheet_name, start_row, end_row):
+        """シートの start_row 行目から end_row 行目までを取得する（スレッドプールから呼ばれる）"""
+        result = (
+            self._get_thread_service()
+            .spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{self._quote_sheet_name(sheet_name)}!{start_row}:{end_row}",
+            )
+            .execute()
+        )
+        return result.get("values", [])
+
+    def _get_row_count(self, sheet_name):
+        """シートの行数(gridProperties.rowCount)を取得する"""
+        for sheet in self._get_metadata():
+            if sheet["properties"]["title"] == sheet_name:
+                return sheet["properties"].get("gridProperties", {}).get("rowCount", 0)
+        return None
+
+    def get_sheets_data(self, ranges, columns=None, value_render_option="FORMATTED_VALUE"):
+        """
+        複数シートのデータを values.batchGet の1リクエストでまとめて取得する。
+        値は列優先(majorDimension=COLUMNS)で転送し、columnsで指定した列だけを取得する。
+        :param ranges: 取得するシート名のリスト
+        :param columns: {シート名: 取得する列番号(0始まり)のリスト}。指定しないシートは全列を取得する
+        :param value_render_option: FORMATTED_VALUE / UNFORMATTED_VALUE / FORMULA
+        :return: {シート名: 列ごとの値リストのリスト}。各列の長さは最長の列に揃え、足りない分はNoneで埋める
+        """
+        if not self.service:
+            print("Error: Google Sheets service not initialized.")
+            return None
+
+        columns = columns or {}
+        # リクエストするA1表記の範囲と、その結果を格納するシート名の対応
+        request_ranges = []
+        owners = []
+        for sheet_name in ranges:
+            if sheet_name in columns:
+                for column_index in columns[sheet_name]:
+                    letter = self._column_letter(column_index)
+                    request_ranges.append(f"{self._quote_sheet_name(sheet_name)}!{letter}:{letter}")
+                    owners.append(sheet_name)
+            else:
+                request_ranges.append(self._quote_sheet_name(sheet_name))
+                owners.append(sheet_name)
+
+        try:
+            result = self._read_through_mirror(
+                ["batchGet", request_ranges, value_render_option],
+                lambda: self._get_thread_service()
+                .spreadsheets()
+                .values()
+                .batchGet(
+                    spreadsheetId=self.spreadsheet_id,
+                    ranges=request_ranges,
+                    majorDimension="COLUMNS",
+                    valueRenderOption=value_render_option,
+                )
+                .execute(),
+            )
+        except HttpError as error:
+            print(f"An error occurred: {error}")
+            return None
+
+        sheets_data = {sheet_name: [] for sheet_name in ranges}
+        for sheet_name, value_range in zip(owners, result.get("valueRanges", [])):
+            values = value_range.get("values", [])
+            if sheet_name in columns:
+                # 列単位で指定した範囲は、列が空の場合valuesが返らないため空の列で補う
+                values = values or [[]]
+            sheets_data[sheet_name].extend(values)
+
+        # 列優先では末尾の空セルが省略されるため、最長の列に揃える
+        for sheet_columns in sheets_data.values():
+            row_count = max((len(column) for column in sheet_columns), default=0)
+            for column in sheet_columns:
+                column.extend([None] * (row_count - len(column)))
+        return sheets_data
+
+    @staticmethod
+    def _column_letter(column_index):
+        """0始まりの列番号をA1表記の列名に変換する"""
+        letter = ""
+        column_index += 1
+        while column_index > 0:
+            column_index, remainder = divmod(column_index - 1, 26)
+            letter = chr(ord("A") + remainder) + letter
+        return letter
+
+    @staticmethod
+    def _quote_sheet_name(sheet_name):
+        """A1表記で使えるようにシート名をシングルクォートで囲む"""
+        return "'" + sheet_name.replace("'", "''") + "'"
+
     def is_admin(self):
         """管理者権限があるか確認する"""
         if not self.admin_email:
@@ -293,6 +858,7 @@ class SheetMaster:
                 spreadsheetId=self.spreadsheet_id,
                 body=body
             ).execute()
+            self._invalidate_metadata()  # シートが追加されたため
             
             print(f"Sheet '{sheet_name}' created successfully.")
             return True
@@ -320,6 +886,7 @@ class SheetMaster:
                 )
                 .execute()
             )
+            self._invalidate_metadata()  # 行が追加されたため
             print(f"Data appended to '{sheet_name}' sheet successfully.")
             return result
         except HttpError as error:
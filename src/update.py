@@ -1,8 +1,11 @@
 import sys
 from dotenv import load_dotenv
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
@@ -15,9 +18,13 @@ sys.path.append(".")  # srcをパスに追加してサブモジュール群を
 import src.const.const as const  # 定数読み込み
 from src.master.dat_master import DatMaster
 from src.master.dir_master import DirMaster
-from src.utils.file_util import read_file_to_string, is_definitely_formula
+from src.utils.formula_util import escape_formula_columns, escape_formula_rows
 from src.master.sheet_master import SheetMaster
 from src.utils.remaining_util import ProgressTracker
+from src.utils.snapshot_cache import SnapshotCache
+from src.utils.translate_diff_util import diff_sorted_records, iter_records_by_key
+from src.utils.fingerprint_util import content_digest, record_fingerprint, record_fingerprints
+from src.utils.sheet_mirror import SheetMirror
 
 
 def main():
@@ -35,27 +42,35 @@ def main():
     latest_dat_path = os.getenv("LATEST_DAT_PATH")
     latest_dir_path = os.getenv("LATEST_DIR_PATH")
 
-    tracker = ProgressTracker(11, description="Updating data")
-
-    tracker.update()
-    print("Reading dat file")
-    dat_string = read_file_to_string(latest_dat_path)
-    dat_master = DatMaster(dat_string)
-
-    tracker.update()
-    print("Reading dir file")
-    dir_string = read_file_to_string(latest_dir_path)
-    dir_master = DirMaster(dir_string)
+    tracker = ProgressTracker(10, description="Updating data")
 
     credentials_path = os.getenv("GOOGLE_CREDENTIALS_PATH")
     spreadsheet_id = os.getenv("GOOGLE_SPREADSHEET_ID")
     admin_email = os.getenv("ADMIN_EMAIL")
-    sheet_master = SheetMaster(credentials_path, spreadsheet_id, admin_email)
+    sheet_master = SheetMaster(
+        credentials_path, spreadsheet_id, admin_email, mirror=SheetMirror.from_env()
+    )
+
+    # ゲームファイルの解析とスプレッドシートの取得は互いに依存しないため、スレッドで並行して実行し、
+    # メタ情報の比較と差分の作成の直前でそれぞれの結果を待つ
+    # （datの解析は主にプロセスプールで行われ、シートの取得は主に通信待ちのため重ねられる）
+    executor = ThreadPoolExecutor(max_workers=3)
+    # 前回と同じ内容のファイルであれば、解析済みのスナップショットから読み込む
+    snapshot_cache = SnapshotCache.from_env()
+    dat_future = executor.submit(
+        DatMaster.from_path, latest_dat_path, processes=os.cpu_count(), cache=snapshot_cache
+    )
+    dir_future = executor.submit(DirMaster.from_path, latest_dir_path, cache=snapshot_cache)
+    # スプレッドシートからdirのメタ情報を取得
+    meta_future = executor.submit(sheet_master.get_sheet_data, const.META_SHEET_NAME)
+
+    tracker.update()
+    print("Reading dir file")
+    dir_master = dir_future.result()
 
     tracker.update()
     print("Getting meta sheet data")
-    # スプレッドシートからdirのメタ情報を取得
-    meta_sheet_data = sheet_master.get_sheet_data(const.META_SHEET_NAME)
+    meta_sheet_data = meta_future.result()
     if not meta_sheet_data:
         print("Error: Failed to get meta sheet data.")
         sys.exit(1)
@@ -64,23 +79,93 @@ def main():
     latest_dir_meta = dir_master.get_meta_data()
 
     # メタ情報を比較
-    if meta_sheet_data[0][0] == latest_dir_meta:
+    if meta_sheet_data[const.META_SHEET_DIR_META_ROW][0] == latest_dir_meta:
         print("メタ情報に差はありません。処理を終了します")
         sys.exit(0)
 
     print("メタ情報に差があります。更新処理を開始します")
 
+    # 前回の更新で書き込んだdatの内容のダイジェスト（無い場合は内容の比較を省略できない）
+    stored_content_digest = (
+        meta_sheet_data[const.META_SHEET_CONTENT_DIGEST_ROW][0]
+        if len(meta_sheet_data) > const.META_SHEET_CONTENT_DIGEST_ROW
+        and meta_sheet_data[const.META_SHEET_CONTENT_DIGEST_ROW]
+        else None
+    )
+
+    # 翻訳シートとオーダーシートはdatの解析を待たずに取得を始め、解析と重ねる
+    # （datの内容に差が無かった場合は、翻訳シートの残りの取得を中止し、取得した結果も破棄する）
+    # スプレッドシートから翻訳シートのデータを取得（古い状態として）
+    # 行範囲ごとに並列に取得し、届いた範囲から順にDataFrameへ変換する
+    cancel_translate_fetch = threading.Event()
+    translate_future = executor.submit(
+        sheet_master.get_sheet_dataframe_windowed,
+        const.TRANSLATE_SHEET_NAME,
+        cancel_event=cancel_translate_fetch,
+    )
+    # オーダーシートから前回のレコードごとのフィンガープリントを取得
+    order_future = executor.submit(
+        sheet_master.get_sheets_data,
+        [const.ORDER_SHEET_NAME],
+        {const.ORDER_SHEET_NAME: list(range(const.ORDER_TABLE_COLUMNS.column_count()))},
+    )
+
+    tracker.update()
+    print("Reading dat file")
+    dat_master = dat_future.result()
+
+    # 最新datのレコードごとのフィンガープリントと、内容全体のダイジェストを求める
+    string_ids, string_types, text_bodies = dat_master.get_columns()
+    string_ids = [
+        string_id.replace(const.UTF8BOM_START_BYTE, "") for string_id in string_ids
+    ]
+    latest_fingerprints = record_fingerprints(string_ids, string_types, text_bodies)
+    latest_content_digest = content_digest(latest_fingerprints)
+    if latest_content_digest == stored_content_digest:
+        # 文字列に変更が無いため、翻訳シートとオーダーシートはそのままでメタ情報だけを更新する
+        print("datの内容に差はありません。メタ情報のみ更新します")
+        # 取得中のシートの結果は使わないため、翻訳シートの未送信の範囲は取得しない
+        # （送信済みのリクエストだけはプロセスの終了時に完了を待つ）
+        cancel_translate_fetch.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        sheet_master.clear_sheet(const.META_SHEET_NAME)
+        if (
+            sheet_master.update_sheet(
+                const.META_SHEET_NAME, [[latest_dir_meta], [latest_content_digest]]
+            )
+            is None
+        ):
+            print("Error: Failed to update meta sheet.")
+            sys.exit(1)
+        sys.exit(0)
+
     tracker.update()
     print("Getting translate sheet data")
-    # スプレッドシートから翻訳シートのデータを取得（古い状態として）
-    translate_sheet_data = sheet_master.get_sheet_data(const.TRANSLATE_SHEET_NAME)
-    if not translate_sheet_data:
+    translate_sheet_result = translate_future.result()
+    executor.shutdown()
+    if not translate_sheet_result:
         print("Error: Failed to get translate_sheet data.")
         sys.exit(1)
 
-    old_translate_sheet_df = pd.DataFrame(
-        translate_sheet_data[1:], columns=translate_sheet_data[0]
-    )
+    # 前回のレコードごとのフィンガープリント {(string_id, string_type): フィンガープリント}
+    stored_fingerprints = {}
+    order_sheet_result = order_future.result()
+    order_sheet_columns = (order_sheet_result or {}).get(const.ORDER_SHEET_NAME, [])
+    if [
+        column[0] for column in order_sheet_columns if column
+    ] == const.ORDER_TABLE_COLUMNS.column_names():
+        stored_string_ids, stored_string_types, stored_fingerprint_values = (
+            column[1:] for column in order_sheet_columns
+        )
+        stored_fingerprints = {
+            (str(string_id or "").replace(const.UTF8BOM_START_BYTE, ""), string_type or ""): fingerprint
+            for string_id, string_type, fingerprint in zip(
+                stored_string_ids, stored_string_types, stored_fingerprint_values
+            )
+            if fingerprint
+        }
+
+    translate_sheet_header, old_translate_sheet_df = translate_sheet_result
     old_translate_sheet_df = old_translate_sheet_df.fillna("")
     old_translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.string_id.value] = (
         old_translate_sheet_df[
@@ -88,32 +173,42 @@ def main():
         ].str.replace(const.UTF8BOM_START_BYTE, "")
     )
 
-    # 最新datを元に翻訳シートと同じ形式の空のインスタンスを作成
-    latest_translate_sheet_df = pd.DataFrame(columns=translate_sheet_data[0])
+    # 最新datの列から翻訳シートと同じ形式のデータフレームを一括で作成
+    record_count = len(string_ids)
+    latest_translate_sheet_df = pd.DataFrame(
+        {
+            const.TRANSLATE_TABLE_COLUMNS.string_id.value: pd.Series(
+                string_ids, dtype=object
+            ),
+            const.TRANSLATE_TABLE_COLUMNS.string_type.value: pd.Series(
+                string_types, dtype=object
+            ),
+            const.TRANSLATE_TABLE_COLUMNS.text_body.value: pd.Series(
+                text_bodies, dtype=object
+            ),
+            const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value: pd.Series(
+                [""] * record_count, dtype=object
+            ),  # 初期値
+            const.TRANSLATE_TABLE_COLUMNS.latest_status.value: pd.Series(
+                [const.TRANSLATE_STATUS.未翻訳.value] * record_count, dtype=object
+            ),  # 初期値
+            const.TRANSLATE_TABLE_COLUMNS.before_status.value: pd.Series(
+                [const.TRANSLATE_STATUS.未翻訳.value] * record_count, dtype=object
+            ),  # 初期値
+        }
+    )
+    # 列の並びは翻訳シートのヘッダーに合わせる
+    latest_translate_sheet_df = latest_translate_sheet_df.reindex(
+        columns=list(translate_sheet_header)
+        + [
+            column
+            for column in latest_translate_sheet_df.columns
+            if column not in translate_sheet_header
+        ]
+    )
 
-    # dat_masterからデータを取得してデータフレームに追加
+    # オーダーシートの更新で使用する
     master_data = dat_master.get_master_data()
-    for index, row in master_data.iterrows():
-        string_id = str(row[const.STRING_TABLE_COLUMNS.string_id.value]).replace(
-            const.UTF8BOM_START_BYTE, ""
-        )
-        string_type = row[const.STRING_TABLE_COLUMNS.string_type.value]
-        text_body = row[const.STRING_TABLE_COLUMNS.text_body.value]
-        new_row = pd.DataFrame(
-            [
-                {
-                    const.TRANSLATE_TABLE_COLUMNS.string_id.value: string_id,
-                    const.TRANSLATE_TABLE_COLUMNS.string_type.value: string_type,
-                    const.TRANSLATE_TABLE_COLUMNS.text_body.value: text_body,
-                    const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value: "",  # 初期値
-                    const.TRANSLATE_TABLE_COLUMNS.latest_status.value: const.TRANSLATE_STATUS.未翻訳.value,  # 初期値
-                    const.TRANSLATE_TABLE_COLUMNS.before_status.value: const.TRANSLATE_STATUS.未翻訳.value,  # 初期値
-                }
-            ]
-        )
-        latest_translate_sheet_df = pd.concat(
-            [latest_translate_sheet_df, new_row], ignore_index=True
-        )
 
     tracker.update()
     print("Comparing dataframes")
@@ -125,40 +220,55 @@ def main():
     # ・old_translate_sheet_dfにキーはあるが、latest_translate_sheet_dfに無い場合：削除
     # ・latest_translate_sheet_dfにキーはあるが、old_translate_sheet_dfに無い場合：未翻訳
     # ・old_translate_sheet_dfとlatest_translate_sheet_df双方にキーはあるが、text_bodyの内容が違う場合：要確認
-    old_translate_sheet_df_keyed = old_translate_sheet_df.set_index(
-        [
-            const.TRANSLATE_TABLE_COLUMNS.string_id.value,
-            const.TRANSLATE_TABLE_COLUMNS.string_type.value,
-        ]
-    )
-    latest_translate_sheet_df_keyed = latest_translate_sheet_df.set_index(
-        [
-            const.TRANSLATE_TABLE_COLUMNS.string_id.value,
-            const.TRANSLATE_TABLE_COLUMNS.string_type.value,
-        ]
-    )
-
-    deleted_keys = old_translate_sheet_df_keyed.index.difference(
-        latest_translate_sheet_df_keyed.index
-    )
-    new_keys = latest_translate_sheet_df_keyed.index.difference(
-        old_translate_sheet_df_keyed.index
-    )
-    common_keys = old_translate_sheet_df_keyed.index.intersection(
-        latest_translate_sheet_df_keyed.index
+    # 双方をキーの昇順に並べて1回のマージで比較する（キー付きの複製や共通キーのスライスは作らない）
+    # text_bodyはフィンガープリントで比べる。古い側はオーダーシートに保存したフィンガープリントを使い、
+    # 保存されていないレコードだけシート上のtext_bodyから求める
+    # （シートへの書き込みで先頭のシングルクォートなどが変わっても、変更と誤判定しない）
+    key_column_names = [
+        const.TRANSLATE_TABLE_COLUMNS.string_id.value,
+        const.TRANSLATE_TABLE_COLUMNS.string_type.value,
+    ]
+    # 数式として解釈されないようにエスケープする列
+    text_column_names = [
+        const.TRANSLATE_TABLE_COLUMNS.text_body.value,
+        const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value,
+    ]
+    old_string_ids = old_translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.string_id.value].tolist()
+    old_string_types = old_translate_sheet_df[
+        const.TRANSLATE_TABLE_COLUMNS.string_type.value
+    ].tolist()
+    old_fingerprints = [
+        stored_fingerprints.get((string_id, string_type))
+        or record_fingerprint(string_id, string_type, text_body)
+        for string_id, string_type, text_body in zip(
+            old_string_ids,
+            old_string_types,
+            old_translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.text_body.value].tolist(),
+        )
+    ]
+    translate_diff = diff_sorted_records(
+        iter_records_by_key(old_string_ids, old_string_types, old_fingerprints),
+        iter_records_by_key(string_ids, string_types, latest_fingerprints),
     )
-    modified_keys = common_keys[
-        old_translate_sheet_df_keyed.loc[common_keys][
-            const.TRANSLATE_TABLE_COLUMNS.text_body.value
-        ]
-        != latest_translate_sheet_df_keyed.loc[common_keys][
-            const.TRANSLATE_TABLE_COLUMNS.text_body.value
-        ]
+    deleted_old_positions = translate_diff["deleted"]
+    modified_old_positions, modified_latest_positions = translate_diff["modified"]
+    unchanged_old_positions, unchanged_latest_positions = translate_diff["unchanged"]
+    deleted_keys = [
+        (old_string_ids[position], old_string_types[position])
+        for position in deleted_old_positions.tolist()
+    ]
+    new_keys = [
+        (string_ids[position], string_types[position])
+        for position in translate_diff["new"].tolist()
+    ]
+    modified_keys = [
+        (string_ids[position], string_types[position])
+        for position in modified_latest_positions.tolist()
     ]
 
-    print(f"削除されたキー: {deleted_keys.tolist()}")
-    print(f"新規キー: {new_keys.tolist()}")
-    print(f"変更されたキー: {modified_keys.tolist()}")
+    print(f"削除されたキー: {deleted_keys}")
+    print(f"新規キー: {new_keys}")
+    print(f"変更されたキー: {modified_keys}")
 
     # アーカイブ処理
     tracker.update()
@@ -170,7 +280,7 @@ def main():
         sheet_master.create_sheet(const.ARCHIVE_SHEET_NAME)
         
         # アーカイブシートのヘッダー作成（翻訳シートヘッダー + アーカイブ日時）
-        archive_headers = translate_sheet_data[0].copy()
+        archive_headers = translate_sheet_header.copy()
         archive_headers.append(const.ARCHIVE_TABLE_COLUMNS.archive_date.value)
         sheet_master.update_sheet(const.ARCHIVE_SHEET_NAME, [archive_headers])
 
@@ -183,112 +293,104 @@ def main():
         
         # 削除された項目のデータを取得してアーカイブ用に加工
         deleted_items = []
-        for key in deleted_keys:
+        archive_values = old_translate_sheet_df.drop(columns=key_column_names)
+        for key, old_position in zip(deleted_keys, deleted_old_positions.tolist()):
             # 行データを取得 (text_body以降)
-            row_values = old_translate_sheet_df_keyed.loc[key].tolist()
+            row_values = archive_values.iloc[old_position].tolist()
             # key (string_id, string_type) をリストに変換して結合
             row_data = list(key) + row_values
             # アーカイブ日時を追加
             row_data.append(current_datetime)
             deleted_items.append(row_data)
         
-        # アーカイブシートに追加
+        # アーカイブシートに追加（翻訳シートと同様に、数式として解釈される文字列はエスケープする）
         if deleted_items:
+            archive_columns = key_column_names + archive_values.columns.tolist()
+            deleted_items, _ = escape_formula_rows(
+                deleted_items,
+                [
+                    archive_columns.index(column)
+                    for column in text_column_names
+                    if column in archive_columns
+                ],
+            )
             sheet_master.append_to_sheet(const.ARCHIVE_SHEET_NAME, deleted_items)
 
-    # 古い翻訳シートのlatest_statusを、キーが同じのlatest_translate_sheet_dfのbefore_statusにコピー
-    merged_df = latest_translate_sheet_df.merge(
-        old_translate_sheet_df[
-            [
-                const.TRANSLATE_TABLE_COLUMNS.string_id.value,
-                const.TRANSLATE_TABLE_COLUMNS.string_type.value,
-                const.TRANSLATE_TABLE_COLUMNS.latest_status.value,
-            ]
-        ],
-        on=[
-            const.TRANSLATE_TABLE_COLUMNS.string_id.value,
-            const.TRANSLATE_TABLE_COLUMNS.string_type.value,
-        ],
-        how="left",
-    )
-    latest_translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.before_status.value] = (
-        merged_df[const.TRANSLATE_TABLE_COLUMNS.latest_status.value + "_y"].fillna(
-            const.TRANSLATE_STATUS.未翻訳.value
-        )
-    )
-
     tracker.update()
     print("Updating translate sheet dataframe")
-    # 差分を元に、新しい翻訳シートのインスタンスのlatest_statusを更新
-    latest_translate_sheet_df = latest_translate_sheet_df.set_index(
-        [
-            const.TRANSLATE_TABLE_COLUMNS.string_id.value,
-            const.TRANSLATE_TABLE_COLUMNS.string_type.value,
-        ]
+    # 差分で対応付けた (古い行の位置, 最新の行の位置) を結合キーとして、ステータスと翻訳を列単位で一括して設定する
+    # ・before_status: 双方にあるキーは古い翻訳シートのlatest_status、新規キーは「未翻訳」
+    # ・latest_status: 新規キーは初期値の「未翻訳」のまま、変更されたキーは「要確認」、
+    #   変更がないキーは古いステータスを維持 (before_statusからコピー)
+    # ・translate_text_body: 双方にあるキーは古い翻訳シートの内容を引き継ぐ
+    # 削除されたキーは「latest_translate_sheet_df」に存在しないため対象外
+    common_old_positions = np.concatenate([modified_old_positions, unchanged_old_positions])
+    common_latest_positions = np.concatenate(
+        [modified_latest_positions, unchanged_latest_positions]
     )
 
-    # 削除された場合は「latest_translate_sheet_df」にキーは存在しないので、ここはコメントアウト
-    # if deleted_keys:
-    #     # 削除されたIDのステータスを更新
-    #     latest_translate_sheet_df.loc[deleted_keys, "latest_status"] = const.TRANSLATE_STATUS.削除.value
+    before_status = np.full(record_count, const.TRANSLATE_STATUS.未翻訳.value, dtype=object)
+    before_status[common_latest_positions] = old_translate_sheet_df[
+        const.TRANSLATE_TABLE_COLUMNS.latest_status.value
+    ].to_numpy(dtype=object)[common_old_positions]
+    latest_status = before_status.copy()
+    latest_status[modified_latest_positions] = const.TRANSLATE_STATUS.要確認.value
+    translate_text_body = np.full(record_count, "", dtype=object)
+    translate_text_body[common_latest_positions] = old_translate_sheet_df[
+        const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value
+    ].to_numpy(dtype=object)[common_old_positions]
+
+    latest_translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.before_status.value] = before_status
+    latest_translate_sheet_df[const.TRANSLATE_TABLE_COLUMNS.latest_status.value] = latest_status
+    latest_translate_sheet_df[
+        const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value
+    ] = translate_text_body
 
-    # 新規IDのステータスは初期値の「未翻訳」のまま
-
-    # 変更されたデータのステータスを更新
-    latest_translate_sheet_df.loc[
-        modified_keys, const.TRANSLATE_TABLE_COLUMNS.latest_status.value
-    ] = const.TRANSLATE_STATUS.要確認.value
+    # text_bodyとtranslate_text_bodyをチェックして、必要に応じてシングルクォートを先頭に追加
+    latest_translate_sheet_df, escape_stats = escape_formula_columns(
+        latest_translate_sheet_df, text_column_names
+    )
+    print(
+        f"数式として解釈されないようにエスケープしたセル: {escape_stats['escaped']}/{escape_stats['checked']} "
+        f"{escape_stats['columns']}"
+    )
 
-    # 変更がない場合は古いステータスを維持 (before_statusからコピー)
-    for key in common_keys.difference(modified_keys):
-        latest_translate_sheet_df.loc[
-            key, const.TRANSLATE_TABLE_COLUMNS.latest_status.value
-        ] = latest_translate_sheet_df.loc[
-            key, const.TRANSLATE_TABLE_COLUMNS.before_status.value
+    # キーの列を先頭に並べる
+    latest_translate_sheet_df = latest_translate_sheet_df[
+        key_column_names
+        + [
+            column
+            for column in latest_translate_sheet_df.columns
+            if column not in key_column_names
         ]
-
-    # translate_text_bodyの内容を格納
-    latest_translate_sheet_df.loc[
-        common_keys, const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value
-    ] = old_translate_sheet_df_keyed.loc[
-        common_keys, const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value
     ]
 
-    # text_bodyとtranslate_text_bodyをチェックして、必要に応じてシングルクォートを先頭に追加
-    for index, row in latest_translate_sheet_df.iterrows():
-        if is_definitely_formula(row[const.TRANSLATE_TABLE_COLUMNS.text_body.value]):
-            latest_translate_sheet_df.loc[
-                index, const.TRANSLATE_TABLE_COLUMNS.text_body.value
-            ] = f"'{row['text_body']}"
-        if is_definitely_formula(
-            row[const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value]
-        ):
-            latest_translate_sheet_df.loc[
-                index, const.TRANSLATE_TABLE_COLUMNS.translate_text_body.value
-            ] = f"'{row['translate_text_body']}"
-
-    latest_translate_sheet_df = latest_translate_sheet_df.reset_index()
-
     tracker.update()
-    print("Clearing sheets")
-    # gs翻訳シートとgsメタシートをクリア
-    sheet_master.clear_sheet(const.TRANSLATE_SHEET_NAME)
-    sheet_master.clear_sheet(const.META_SHEET_NAME)
-    sheet_master.clear_sheet(const.ORDER_SHEET_NAME)
-
-    tracker.update()
-    print("Updating translate sheet")
-    # 新しい翻訳シートのインスタンスを元に翻訳シートを更新
-    sheet_master.update_sheet(
+    print("Syncing translate sheet")
+    # 読み込んだ翻訳シートとの差分（変更・挿入・削除された行）だけを書き込む
+    latest_translate_sheet_rows = [
+        latest_translate_sheet_df.columns.tolist()
+    ] + latest_translate_sheet_df.values.tolist()
+    synced = sheet_master.sync_sheet_rows(
         const.TRANSLATE_SHEET_NAME,
-        [latest_translate_sheet_df.columns.tolist()]
-        + latest_translate_sheet_df.values.tolist(),
+        [translate_sheet_header] + old_translate_sheet_df.values.tolist(),
+        latest_translate_sheet_rows,
+        key_count=2,  # string_id, string_type
     )
 
-    tracker.update()
-    print("Updating meta sheet")
-    # メタシートに最新dirのメタ情報を書き込む
-    sheet_master.update_sheet(const.META_SHEET_NAME, [[latest_dir_meta]])
+    if not synced:
+        print("Updating translate sheet")
+        # 差分同期できなかった場合は、翻訳シートをクリアして新しい翻訳シートのインスタンスで書き直す
+        # （行範囲ごとに分割して並列に書き込む）
+        if sheet_master.clear_sheet(const.TRANSLATE_SHEET_NAME) is None or (
+            sheet_master.update_sheet_chunked(
+                const.TRANSLATE_SHEET_NAME, latest_translate_sheet_rows
+            )
+            is None
+        ):
+            # 途中まで書き込まれている可能性があるため、メタシートは更新せずに終了し、次回の実行で更新し直す
+            print("Error: Failed to update translate sheet.")
+            sys.exit(1)
 
     tracker.update()
     print("Updating order sheet")
@@ -302,12 +404,41 @@ def main():
             const.STRING_TABLE_COLUMNS.string_type.value,
         ]
     ].copy()
-
-    # オーダーシートを更新
-    sheet_master.update_sheet(
+    # 次回の更新で変更されたレコードを判定するためのフィンガープリント
+    order_sheet_data[const.ORDER_TABLE_COLUMNS.fingerprint.value] = latest_fingerprints
+
+    latest_order_sheet_rows = [
+        order_sheet_data.columns.tolist()
+    ] + order_sheet_data.values.tolist()
+    # 読み込んだオーダーシートとの差分だけを書き込む（シートを空にする時間を作らない）
+    # 読み込めなかった場合や差分同期できなかった場合は、クリアして全体を書き直す
+    order_synced = order_sheet_result is not None and sheet_master.sync_sheet_rows(
         const.ORDER_SHEET_NAME,
-        [order_sheet_data.columns.tolist()] + order_sheet_data.values.tolist(),
+        [list(row) for row in zip(*order_sheet_columns)],
+        latest_order_sheet_rows,
+        key_count=2,  # string_id, string_type
     )
+    if not order_synced and (
+        sheet_master.clear_sheet(const.ORDER_SHEET_NAME) is None
+        or sheet_master.update_sheet_chunked(const.ORDER_SHEET_NAME, latest_order_sheet_rows)
+        is None
+    ):
+        print("Error: Failed to update order sheet.")
+        sys.exit(1)
+
+    tracker.update()
+    print("Updating meta sheet")
+    # メタシートに最新dirのメタ情報とdatの内容のダイジェストを書き込む
+    # 次回の実行はメタ情報とダイジェストが一致すると終了するため、他のシートをすべて書き込んだ後に最後に更新する
+    sheet_master.clear_sheet(const.META_SHEET_NAME)
+    if (
+        sheet_master.update_sheet(
+            const.META_SHEET_NAME, [[latest_dir_meta], [latest_content_digest]]
+        )
+        is None
+    ):
+        print("Error: Failed to update meta sheet.")
+        sys.exit(1)
     tracker.finish()
 
 
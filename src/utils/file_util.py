@@ -1,33 +1,181 @@
 import chardet
-import re
+import codecs
+import mmap
+import os
+from src.utils.formula_util import FORMULA_PATTERN
 
 
-def detect_encoding(file_path):
+# エンコーディング判定に読み込む先頭のバイト数の上限
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# chardetに一度に渡すバイト数
+ENCODING_DETECT_BLOCK_SIZE = 4096
+# BOMとそれが示すエンコーディング（UTF-32 LEのBOMはUTF-16 LEのBOMを含むため先に判定する）
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detect_encoding(file_path, sample_size=ENCODING_SAMPLE_SIZE):
     """
     ファイルのエンコーディングを自動検出し、検出されたエンコーディングを返す。
+    ファイル全体ではなく先頭sample_sizeバイトだけを読み、以下の順に判定する。
+      1. BOMがあれば、それが示すエンコーディング
+      2. UTF-8として正しくデコードできれば "utf-8"（末尾で途切れたマルチバイト文字は許容する）
+      3. chardetにブロックごとに渡し、確信度が十分になった時点で打ち切った結果
     Args:
         file_path (str): ファイルのパス。
+        sample_size (int): 判定に使う先頭のバイト数の上限。
     Returns:
         str: 検出されたエンコーディング。検出に失敗した場合はNone。
     """
-    encodings = ["utf-8", "utf-8-sig", "latin-1"]
-    for encoding in encodings:
-        try:
-            with open(file_path, "rb") as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                if result["encoding"]:
-                    return result["encoding"]
-        except UnicodeDecodeError:
-            continue
-    return None
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_size)
+
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    detector = chardet.UniversalDetector()
+    for offset in range(0, len(sample), ENCODING_DETECT_BLOCK_SIZE):
+        detector.feed(sample[offset : offset + ENCODING_DETECT_BLOCK_SIZE])
+        if detector.done:
+            break
+    detector.close()
+    return detector.result["encoding"]
+
+
+def resolve_encoding(file_path, encoding=None):
+    """
+    encodingがNoneの場合は detect_encoding で判定したエンコーディングを返す（判定できない場合は "utf-8"）。
+    ファイルを複数回・複数プロセスで読む場合に、先に一度だけ判定しておくために使う。
+    Args:
+        file_path (str): ファイルのパス。
+        encoding (str): 指定されたエンコーディング。
+    Returns:
+        str: 読み込みに使うエンコーディング。
+    """
+    if encoding is None:
+        encoding = detect_encoding(file_path) or "utf-8"
+    return encoding
 
 
 def read_file_to_string(file_path, encoding="utf-8"):
-    with open(file_path, "r", encoding="utf-8") as f:  # エンコードを強制的にutf-8に
+    """
+    ファイル全体を文字列として読み込む。
+    Args:
+        file_path (str): ファイルのパス。
+        encoding (str): デコードに使用するエンコーディング。Noneの場合は detect_encoding で判定する。
+    Returns:
+        str: ファイルの内容。
+    """
+    encoding = resolve_encoding(file_path, encoding)
+    with open(file_path, "r", encoding=encoding) as f:
         return f.read()
 
 
+def iter_file_lines(file_path, encoding="utf-8", start=0, end=None):
+    """
+    ファイルをメモリマップし、1行ずつデコードして返すジェネレータ。
+    ファイル全体を文字列として保持しないため、巨大なファイルでもメモリ使用量が一定に保たれる。
+    先頭のUTF-8 BOMは取り除かれ、改行コードは read_file_to_string(...).splitlines() と同じ規則で分割される。
+    Args:
+        file_path (str): ファイルのパス。
+        encoding (str): デコードに使用するエンコーディング。Noneの場合は detect_encoding で判定する。
+            改行を1バイトの b"\\n" で表すエンコーディング（UTF-8やShift_JISなど）のみ対応する。
+        start (int): 読み込みを開始するバイト位置。行頭である必要がある。
+        end (int): 読み込みを終了するバイト位置。Noneの場合はファイル末尾まで。
+    Yields:
+        tuple[str, int]: 改行コードを除いた行と、その行を読み進めたバイト数。
+    """
+    encoding = resolve_encoding(file_path, encoding)
+    if codecs.lookup(encoding).name.startswith(("utf-16", "utf-32")):
+        raise ValueError(f"行単位の読み込みに対応していないエンコーディングです: {encoding}")
+    if codecs.lookup(encoding).name == "utf-8-sig":
+        encoding = "utf-8"  # BOMは下で読み飛ばす
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # 空ファイルはmmapできない
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if end is None:
+                end = len(mm)
+            if start == 0 and mm[:3] == b"\xef\xbb\xbf":
+                start = 3  # UTF-8 BOM を読み飛ばす
+            mm.seek(start)
+            while mm.tell() < end:
+                raw_line = mm.readline()
+                # 改行コードを含めたままsplitlinesすることで、CRや空行の扱いを全体のsplitlinesと一致させる
+                lines = raw_line.decode(encoding).splitlines()
+                consumed = len(raw_line)
+                for line in lines:
+                    yield line, consumed
+                    consumed = 0
+
+
+def split_line_aligned_ranges(file_path, count):
+    """
+    ファイルを行境界に揃えた最大count個のバイト範囲に分割する。
+    Args:
+        file_path (str): ファイルのパス。
+        count (int): 分割数。
+    Returns:
+        list[tuple[int, int]]: (開始バイト位置, 終了バイト位置) のリスト。
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return []
+    boundaries = [0]
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(1, count):
+                newline = mm.find(b"\n", max(size * i // count, boundaries[-1]))
+                if newline == -1:
+                    break
+                if newline + 1 < size:
+                    boundaries.append(newline + 1)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def write_lines(f, lines, line_end, batch_size=10000, tracker=None, encoding="utf-8"):
+    """
+    行をbatch_size件ずつまとめてエンコードし、バイナリファイルへ一括で書き込む。
+    各行の末尾にはline_endが付与される。
+    Args:
+        f: バイナリモードで開かれたファイルオブジェクト。
+        lines (Iterable[str]): 改行コードを含まない行のイテラブル。
+        line_end (str): 各行の末尾に付与する改行コード。
+        batch_size (int): 一度に書き込む行数。
+        tracker (ProgressTracker): 進捗表示。書き込んだ行数をバッチ単位で加算する。
+        encoding (str): エンコーディング。
+    """
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= batch_size:
+            _flush_lines(f, buffer, line_end, tracker, encoding)
+    _flush_lines(f, buffer, line_end, tracker, encoding)
+
+
+def _flush_lines(f, buffer, line_end, tracker, encoding):
+    if not buffer:
+        return
+    buffer.append("")  # joinで最終行の末尾にもline_endを付与するための番兵
+    f.write(line_end.join(buffer).encode(encoding))
+    if tracker:
+        tracker.update(len(buffer) - 1)
+    buffer.clear()
+
+
 def split_line(line, num_cols, sep="\t"):
     parts = line.split(sep)
     if len(parts) <= num_cols:
@@ -47,16 +195,5 @@ def is_definitely_formula(text):
     if not isinstance(text, str):
         return False
 
-    # スプレッドシートの数式で使われる可能性のあるパターンを検出
-    patterns = [
-        r"^[=+]?.+%",  #  `=` または `+` で始まり、少なくとも1つの文字があり、`%` を含む
-        r"#count\(\[.+\]\)",  # `#count([` と `])` で囲まれたパターン
-        r"^[=+][A-Za-z0-9\s:]+",  # `=` または `+` で始まり、英数字、空白、コロンを含む (例: `=Loyalty:`)
-        r"^'.+'",  # シングルクォートで囲まれた文字列
-    ]
-
-    for pattern in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return True
-
-    return False
+    # スプレッドシートの数式で使われる可能性のあるパターンを、結合済みの正規表現1つで検出
+    return FORMULA_PATTERN.search(text) is not None
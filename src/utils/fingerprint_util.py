@@ -0,0 +1,36 @@
+import hashlib
+
+# レコードのフィンガープリントのバイト数（16進数で16文字）
+FINGERPRINT_SIZE = 8
+# シートにUSER_ENTEREDで書き込んでも数値や日時と解釈されないよう、英字で始める
+FINGERPRINT_PREFIX = "b"
+DIGEST_PREFIX = "sha256"
+# フィールドの区切り（string_id・string_type・text_bodyに現れない制御文字）
+FIELD_SEPARATOR = "\x1f"
+
+
+def record_fingerprint(string_id, string_type, text_body):
+    """(string_id, string_type, text_body) のフィンガープリントを文字列で返す"""
+    return FINGERPRINT_PREFIX + hashlib.blake2b(
+        FIELD_SEPARATOR.join((string_id, string_type, text_body)).encode("utf-8"),
+        digest_size=FINGERPRINT_SIZE,
+    ).hexdigest()
+
+
+def record_fingerprints(string_ids, string_types, text_bodies):
+    """列ごとのリストから、各レコードのフィンガープリントのリストを返す"""
+    return [
+        record_fingerprint(string_id, string_type, text_body)
+        for string_id, string_type, text_body in zip(string_ids, string_types, text_bodies)
+    ]
+
+
+def content_digest(fingerprints):
+    """
+    レコードのフィンガープリントを並び順どおりに連結したダイジェストを返す。
+    いずれかのレコードの内容、レコードの増減、並び順のどれかが変われば値が変わる。
+    """
+    digest = hashlib.sha256()
+    for fingerprint in fingerprints:
+        digest.update(fingerprint.encode("ascii"))
+    return f"{DIGEST_PREFIX}:{len(fingerprints)}:{digest.hexdigest()}"
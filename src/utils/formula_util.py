@@ -0,0 +1,84 @@
+import re
+import numpy as np
+
+# スプレッドシートの数式として解釈される可能性のあるパターン（いずれかに一致すれば数式とみなす）
+FORMULA_PATTERN = re.compile(
+    "|".join(
+        [
+            r"^[=+]?.+%",  # `=` または `+` で始まり、少なくとも1つの文字があり、`%` を含む
+            r"#count\(\[.+\]\)",  # `#count([` と `])` で囲まれたパターン
+            r"^[=+][A-Za-z0-9\s:]+",  # `=` または `+` で始まり、英数字、空白、コロンを含む (例: `=Loyalty:`)
+            r"^'.+'",  # シングルクォートで囲まれた文字列
+        ]
+    ),
+    re.IGNORECASE,
+)
+# USER_ENTERED で書き込む値を文字列として扱わせるための接頭辞
+ESCAPE_PREFIX = "'"
+
+
+def formula_mask(values):
+    """
+    値の並びのうち、数式として解釈される可能性が高い要素をTrueとするbool配列を返す。
+    文字列以外の値はFalseとする。
+    :param values: 値のリストまたはSeries
+    """
+    search = FORMULA_PATTERN.search
+    return np.fromiter(
+        (isinstance(value, str) and search(value) is not None for value in values),
+        dtype=bool,
+        count=len(values),
+    )
+
+
+def escape_formula_values(values):
+    """
+    値の並びのうち数式として解釈される可能性が高い要素の先頭にシングルクォートを付ける。
+    :param values: 値のリストまたはSeries
+    :return: (エスケープした値のobject配列, エスケープした要素の数)
+    """
+    escaped = np.array(values, dtype=object)
+    positions = np.flatnonzero(formula_mask(escaped))
+    escaped[positions] = [ESCAPE_PREFIX + value for value in escaped[positions]]
+    return escaped, len(positions)
+
+
+def escape_formula_columns(df, columns):
+    """
+    DataFrameの指定した列を列単位でエスケープする。元のDataFrameは変更しない。
+    :param df: 書き込むデータのDataFrame
+    :param columns: エスケープする列名のリスト
+    :return: (エスケープしたDataFrame, {"checked": 判定したセル数, "escaped": エスケープしたセル数,
+              "columns": {列名: エスケープしたセル数}})
+    """
+    escaped_df = df.copy(deep=False)
+    column_counts = {}
+    for column in columns:
+        escaped_df[column], column_counts[column] = escape_formula_values(df[column])
+    return escaped_df, {
+        "checked": len(df) * len(columns),
+        "escaped": sum(column_counts.values()),
+        "columns": column_counts,
+    }
+
+
+def escape_formula_rows(rows, column_indexes):
+    """
+    SheetMasterに渡す行のリストの指定した列をエスケープする。元の行は変更しない。
+    :param rows: 行のリスト
+    :param column_indexes: エスケープする列番号(0始まり)のリスト
+    :return: (エスケープした行のリスト, {"checked": 判定したセル数, "escaped": エスケープしたセル数})
+    """
+    escaped_rows = [list(row) for row in rows]
+    escaped_count = 0
+    checked_count = 0
+    for column_index in column_indexes:
+        row_positions = [i for i, row in enumerate(escaped_rows) if column_index < len(row)]
+        escaped, count = escape_formula_values(
+            [escaped_rows[i][column_index] for i in row_positions]
+        )
+        for i, value in zip(row_positions, escaped):
+            escaped_rows[i][column_index] = value
+        escaped_count += count
+        checked_count += len(row_positions)
+    return escaped_rows, {"checked": checked_count, "escaped": escaped_count}
@@ -0,0 +1,90 @@
+import os
+
+
+class LruFileStore:
+    """
+    1つのファイルを1エントリとしてディレクトリに保存し、max_entries を超えた分を
+    最終利用日時(mtime)が古いものから削除する保存先。SnapshotCache と SheetMirror の共通部分。
+    サブクラスでは以下のクラス属性を定義する。
+      - DIR_ENV, MAX_ENTRIES_ENV: from_env で読む環境変数名
+      - DEFAULT_DIR, DEFAULT_MAX_ENTRIES: 環境変数が無い場合の値
+      - SUFFIX: エントリのファイルの拡張子
+      - ENTRY_NAME: 警告メッセージに使うエントリの呼び名
+    """
+
+    DIR_ENV = None
+    MAX_ENTRIES_ENV = None
+    DEFAULT_DIR = None
+    DEFAULT_MAX_ENTRIES = None
+    SUFFIX = ""
+    ENTRY_NAME = "エントリ"
+
+    def __init__(self, directory, max_entries):
+        """
+        :param directory: エントリの保存先ディレクトリ
+        :param max_entries: 保持するエントリの最大数。超えた分は最終利用日時が古いものから削除する
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+
+    @classmethod
+    def from_env(cls):
+        """環境変数 DIR_ENV, MAX_ENTRIES_ENV から生成する"""
+        return cls(
+            os.getenv(cls.DIR_ENV) or cls.DEFAULT_DIR,
+            int(os.getenv(cls.MAX_ENTRIES_ENV) or cls.DEFAULT_MAX_ENTRIES),
+        )
+
+    def _entry_path(self, name):
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def _read_entry(self, path, read):
+        """
+        read(path) の結果を返す。ファイルが無い場合や壊れている場合はNone。
+        最終利用日時は更新しないため、使うと決めた時点で _touch を呼ぶこと。
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return read(path)
+        except FileNotFoundError:
+            return None  # 別のプロセスやスレッドに削除された
+        except (OSError, ValueError) as error:
+            print(f"Warning: {self.ENTRY_NAME}を読み込めませんでした: {path} ({error})")
+            return None
+
+    def _touch(self, path):
+        """最終利用日時を更新して削除対象から外す"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _write_entry(self, path, write):
+        """write(一時ファイルのパス) で書き込んだファイルをエントリとして置き換え、古いエントリを削除する"""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        write(temp_path)
+        os.replace(temp_path, path)  # 書き込み途中のファイルを読ませない
+        self.evict()
+
+    def evict(self):
+        """max_entries を超えた分のエントリを最終利用日時が古い順に削除する"""
+        if not os.path.isdir(self.directory):
+            return
+        # 別スレッドが同時に保存・削除することがあるため、消えたファイルは無視する
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries :]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,79 @@
+import random
+import socket
+import threading
+import time
+from googleapiclient.errors import HttpError
+
+# 再試行するHTTPステータス（レート制限とサーバー側の一時的なエラー）
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# 冪等でないリクエストでも再試行できるHTTPステータス（適用される前に拒否されるレート制限のみ）
+NON_IDEMPOTENT_RETRYABLE_STATUSES = {429}
+
+
+class TokenBucket:
+    """
+    スレッドセーフなトークンバケット。
+    1分あたりrate_per_minute回までリクエストを許可し、最大capacity回までのバーストを許す。
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(rate_per_minute))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得する。トークンが無い場合は補充されるまで待機する"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated_at) * self.rate_per_second,
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.rate_per_second
+            time.sleep(wait_seconds)
+
+
+def is_retryable_error(error, idempotent=True):
+    """
+    再試行してよいエラーかどうかを返す。
+    冪等でないリクエストは、サーバーで適用された後にレスポンスだけが失われた可能性がある
+    5xxやタイムアウトでは再試行せず、レート制限(429)の場合だけ再試行する。
+    """
+    if isinstance(error, HttpError):
+        statuses = RETRYABLE_STATUSES if idempotent else NON_IDEMPOTENT_RETRYABLE_STATUSES
+        return error.resp.status in statuses
+    return idempotent and isinstance(error, (socket.timeout, TimeoutError, ConnectionError))
+
+
+def execute_with_retry(
+    request_factory, bucket=None, max_retries=5, base_delay=1.0, max_delay=64.0, idempotent=True
+):
+    """
+    リクエストを実行し、一時的なエラーの場合はジッター付きの指数バックオフで再試行する。
+    :param request_factory: 実行するリクエストを生成する関数（再試行のたびに呼ばれる）
+    :param bucket: TokenBucket。指定した場合は送信のたびにトークンを取得する
+    :param max_retries: 最大再試行回数
+    :param base_delay: 最初の再試行までの待機秒数の上限
+    :param max_delay: 待機秒数の上限
+    :param idempotent: Falseの場合（行の挿入・削除など）、レート制限(429)のエラーだけを再試行する
+    :return: (レスポンス, 再試行回数)
+    """
+    retries = 0
+    while True:
+        if bucket:
+            bucket.acquire()
+        try:
+            return request_factory().execute(), retries
+        except Exception as error:
+            if retries >= max_retries or not is_retryable_error(error, idempotent):
+                raise
+            # Full Jitter: 0 から base_delay * 2^retries (上限 max_delay) の間でランダムに待機する
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2**retries)))
+            retries += 1
@@ -0,0 +1,78 @@
+def _entered_value(value):
+    """
+    USER_ENTERED で書き込んだ値が、書き込み後にFORMATTED_VALUEとして読み戻される形に近づける。
+    先頭のシングルクォートは文字列扱いの指定として取り除かれる。
+    """
+    if value is None:
+        return ""
+    value = str(value)
+    return value[1:] if value.startswith("'") else value
+
+
+def _read_value(value):
+    return "" if value is None else str(value)
+
+
+def row_keys(rows, key_count):
+    """
+    シートから読み込んだ行の先頭key_count列をキーのリストにする。
+    読み込み方によって末尾の空行の有無が異なるため、末尾の空のキーは取り除く。
+    """
+    keys = [
+        tuple(_read_value(row[column]) if column < len(row) else "" for column in range(key_count))
+        for row in rows
+    ]
+    while keys and not any(keys[-1]):
+        keys.pop()
+    return keys
+
+
+def compute_row_delta(old_rows, new_rows, key_count):
+    """
+    シートから読み込んだ行(old_rows)を新しい行(new_rows)に変えるための差分を求める。
+    行は先頭key_count列をキーとして対応付ける。
+    キーが重複している場合や、共通するキーの並び順が変わっている場合は差分で表せないためNoneを返す。
+    :param old_rows: シートから読み込んだ行のリスト（ヘッダー行を含む）
+    :param new_rows: 書き込みたい行のリスト（ヘッダー行を含む）
+    :param key_count: キーとして扱う先頭の列数
+    :return: {"deleted": 削除するold_rowsの添字, "inserted": 挿入するnew_rowsの添字,
+              "changed": 値を書き換えるnew_rowsの添字} (いずれも昇順のリスト) またはNone
+    """
+    width = max((len(row) for row in new_rows), default=0)
+    old_keys = [tuple(_read_value(v) for v in row[:key_count]) for row in old_rows]
+    new_keys = [tuple(_entered_value(v) for v in row[:key_count]) for row in new_rows]
+    old_positions = {key: i for i, key in enumerate(old_keys)}
+    new_positions = {key: i for i, key in enumerate(new_keys)}
+    if len(old_positions) != len(old_keys) or len(new_positions) != len(new_keys):
+        return None
+
+    deleted = [i for i, key in enumerate(old_keys) if key not in new_positions]
+    inserted = [i for i, key in enumerate(new_keys) if key not in old_positions]
+    common_in_old_order = [key for key in old_keys if key in new_positions]
+    common_in_new_order = [key for key in new_keys if key in old_positions]
+    if common_in_old_order != common_in_new_order:
+        return None
+
+    changed = []
+    for key in common_in_new_order:
+        old_row = old_rows[old_positions[key]]
+        new_row = new_rows[new_positions[key]]
+        for column in range(width):
+            old_value = _read_value(old_row[column]) if column < len(old_row) else ""
+            new_value = _entered_value(new_row[column]) if column < len(new_row) else ""
+            if old_value != new_value:
+                changed.append(new_positions[key])
+                break
+    changed.sort()
+    return {"deleted": deleted, "inserted": inserted, "changed": changed}
+
+
+def to_runs(indexes):
+    """昇順の添字のリストを連続する区間 [(開始, 終了(含まない)), ...] にまとめる"""
+    runs = []
+    for index in indexes:
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+    return [tuple(run) for run in runs]
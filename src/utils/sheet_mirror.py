@@ -0,0 +1,67 @@
+import gzip
+import hashlib
+import json
+from src.utils.lru_file_store import LruFileStore
+
+DEFAULT_MIRROR_DIR = ".cache/sheets"
+DEFAULT_MAX_ENTRIES = 16
+
+
+class SheetMirror(LruFileStore):
+    """
+    スプレッドシートから取得した値をローカルに保存するミラー。
+    各エントリには取得時のスプレッドシートの変更マーカー（Driveのファイルバージョン）を記録し、
+    マーカーが変わっていない場合だけ保存した値を返す。
+    """
+
+    DIR_ENV = "SHEET_MIRROR_DIR"
+    MAX_ENTRIES_ENV = "SHEET_MIRROR_MAX_ENTRIES"
+    DEFAULT_DIR = DEFAULT_MIRROR_DIR
+    DEFAULT_MAX_ENTRIES = DEFAULT_MAX_ENTRIES
+    SUFFIX = ".json.gz"
+    ENTRY_NAME = "シートのミラー"
+
+    def __init__(self, mirror_dir=DEFAULT_MIRROR_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param mirror_dir: ミラーの保存先ディレクトリ
+        :param max_entries: 保持するエントリの最大数。超えた分は最終利用日時が古いものから削除する
+        """
+        super().__init__(mirror_dir, max_entries)
+
+    def __entry_path(self, spreadsheet_id, request_key):
+        digest = hashlib.sha256(
+            json.dumps([spreadsheet_id, request_key], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return self._entry_path(digest)
+
+    def load(self, spreadsheet_id, request_key, marker):
+        """
+        保存した値を返す。エントリが無い場合、壊れている場合、マーカーが異なる場合はNone
+        :param spreadsheet_id: スプレッドシートID
+        :param request_key: 取得内容を表すJSONに変換可能な値（範囲や取得オプション）
+        :param marker: 現在の変更マーカー
+        """
+        if marker is None:
+            return None
+
+        def read(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+
+        path = self.__entry_path(spreadsheet_id, request_key)
+        entry = self._read_entry(path, read)
+        if entry is None or entry.get("marker") != marker:
+            return None
+        self._touch(path)
+        return entry["values"]
+
+    def save(self, spreadsheet_id, request_key, marker, values):
+        """取得した値を変更マーカーと共に保存し、古いエントリを削除する"""
+        if marker is None:
+            return
+
+        def write(temp_path):
+            with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+                json.dump({"marker": marker, "values": values}, f, ensure_ascii=False)
+
+        self._write_entry(self.__entry_path(spreadsheet_id, request_key), write)
@@ -0,0 +1,76 @@
+import hashlib
+import numpy as np
+from src.utils.lru_file_store import LruFileStore
+
+DEFAULT_CACHE_DIR = ".cache/snapshots"
+DEFAULT_MAX_ENTRIES = 4
+
+
+def pack_strings(values):
+    """
+    文字列のリストを (UTF-8バイト列のuint8配列, 各文字列の文字数のint64配列) に変換する。
+    """
+    joined = "".join(values)
+    data = np.frombuffer(joined.encode("utf-8"), dtype=np.uint8)
+    lengths = np.fromiter((len(value) for value in values), dtype=np.int64, count=len(values))
+    return data, lengths
+
+
+def unpack_strings(data, lengths):
+    """pack_strings の逆変換"""
+    joined = data.tobytes().decode("utf-8")
+    ends = np.cumsum(lengths).tolist()
+    starts = [0] + ends[:-1]
+    return [joined[start:end] for start, end in zip(starts, ends)]
+
+
+class SnapshotCache(LruFileStore):
+    """
+    解析済みテーブルを列ごとの配列として圧縮保存するキャッシュ。
+    スナップショットは元ファイルの内容のハッシュとパーサーのバージョンをキーとするため、
+    元ファイルかパーサーが変わった場合は自動的に再解析される。
+    """
+
+    DIR_ENV = "SNAPSHOT_CACHE_DIR"
+    MAX_ENTRIES_ENV = "SNAPSHOT_CACHE_MAX_ENTRIES"
+    DEFAULT_DIR = DEFAULT_CACHE_DIR
+    DEFAULT_MAX_ENTRIES = DEFAULT_MAX_ENTRIES
+    SUFFIX = ".npz"
+    ENTRY_NAME = "スナップショット"
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param cache_dir: スナップショットの保存先ディレクトリ
+        :param max_entries: 保持するスナップショットの最大数。超えた分は最終利用日時が古いものから削除する
+        """
+        super().__init__(cache_dir, max_entries)
+
+    def snapshot_key(self, file_path, kind, parser_version):
+        """元ファイルの内容とパーサーのバージョンからスナップショットのキーを求める"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return f"{kind}-v{parser_version}-{digest.hexdigest()}"
+
+    def load(self, key):
+        """スナップショットを読み込み、配列の辞書を返す。存在しない場合や壊れている場合はNone"""
+
+        def read(path):
+            with np.load(path, allow_pickle=False) as snapshot:
+                return {name: snapshot[name] for name in snapshot.files}
+
+        path = self._entry_path(key)
+        arrays = self._read_entry(path, read)
+        if arrays is not None:
+            self._touch(path)
+        return arrays
+
+    def save(self, key, arrays):
+        """配列の辞書を圧縮して保存し、古いスナップショットを削除する"""
+
+        def write(temp_path):
+            with open(temp_path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+
+        self._write_entry(self._entry_path(key), write)
@@ -0,0 +1,71 @@
+from array import array
+import numpy as np
+
+
+def iter_records_by_key(string_ids, string_types, text_bodies):
+    """
+    列ごとのリストから、キー (string_id, string_type) の昇順に (キー, text_body, 元の位置) をyieldする。
+    並べ替えには位置のリストだけを使い、レコードの複製は作らない。
+    :param string_ids: string_idのリスト
+    :param string_types: string_typeのリスト
+    :param text_bodies: text_bodyのリスト
+    """
+    order = sorted(range(len(string_ids)), key=lambda i: (string_ids[i], string_types[i]))
+    for position in order:
+        yield (string_ids[position], string_types[position]), text_bodies[position], position
+
+
+def _advance(records, previous_key):
+    """次のレコードを返す。キーが昇順に並んでいない場合はValueErrorを送出する"""
+    record = next(records, None)
+    if record is not None and previous_key is not None and record[0] < previous_key:
+        raise ValueError(f"レコードがキーの昇順に並んでいません: {record[0]}")
+    return record
+
+
+def _to_positions(values):
+    return np.frombuffer(values, dtype=np.int64) if len(values) else np.empty(0, dtype=np.int64)
+
+
+def diff_sorted_records(old_records, latest_records):
+    """
+    キーの昇順に並んだ古いレコード列と最新のレコード列を1回のマージで比較する。
+    マージ中に保持するのは各列の現在のレコードだけで、結果はキーやタプルではなく
+    位置だけをint64の配列に溜める（1レコードあたり8〜16バイト）。
+    なお iter_records_by_key は並べ替えのために位置のリストを作るため、全体としてはO(N)のメモリを使う。
+    同じキーが複数ある場合は、出現順に1対1で対応付け、余った分を削除または新規とする。
+    :param old_records: (キー, text_body, 位置) のキー昇順のイテラブル（シートから読み込んだ古い状態）
+    :param latest_records: (キー, text_body, 位置) のキー昇順のイテラブル（最新のdat）
+    :return: {"deleted": 古い位置の配列, "new": 最新の位置の配列,
+              "modified": (古い位置の配列, 最新の位置の配列), "unchanged": (古い位置の配列, 最新の位置の配列)}
+              （いずれもキーの昇順、np.int64の配列）
+    """
+    deleted = array("q")
+    new = array("q")
+    common = {"modified": (array("q"), array("q")), "unchanged": (array("q"), array("q"))}
+    old_records = iter(old_records)
+    latest_records = iter(latest_records)
+    old = _advance(old_records, None)
+    latest = _advance(latest_records, None)
+    while old is not None or latest is not None:
+        if latest is None or (old is not None and old[0] < latest[0]):
+            # 古い側にだけあるキー：削除
+            deleted.append(old[2])
+            old = _advance(old_records, old[0])
+        elif old is None or latest[0] < old[0]:
+            # 最新側にだけあるキー：新規
+            new.append(latest[2])
+            latest = _advance(latest_records, latest[0])
+        else:
+            # 双方にあるキー：text_bodyが違えば変更
+            old_positions, latest_positions = common[
+                "unchanged" if old[1] == latest[1] else "modified"
+            ]
+            old_positions.append(old[2])
+            latest_positions.append(latest[2])
+            old = _advance(old_records, old[0])
+            latest = _advance(latest_records, latest[0])
+    result = {"deleted": _to_positions(deleted), "new": _to_positions(new)}
+    for status, (old_positions, latest_positions) in common.items():
+        result[status] = (_to_positions(old_positions), _to_positions(latest_positions))
+    return result
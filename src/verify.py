@@ -0,0 +1,33 @@
+import sys
+import json
+import os
+from contextlib import redirect_stdout
+
+sys.path.append(".")  # srcをパスに追加してサブモジュール群をインポートできるようにする
+
+from src.master.dat_dir_verifier import verify_dat_dir
+
+
+def main():
+    # 引数が無い場合は create.py の出力を検証する
+    jp_dat_path = (
+        sys.argv[1] if len(sys.argv) > 1 else "data/output/translation_file/ja_jp_data.dat"
+    )
+    jp_dir_path = (
+        sys.argv[2] if len(sys.argv) > 2 else "data/output/translation_file/ja_jp_data.dir"
+    )
+    if not os.path.exists(jp_dat_path) or not os.path.exists(jp_dir_path):
+        print(f"Error: {jp_dat_path} or {jp_dir_path} not found.", file=sys.stderr)
+        sys.exit(1)
+
+    # 標準出力にはサマリーのJSONだけを出力する（dirの読み込み時の進捗表示などは標準エラー出力へ回す）
+    with redirect_stdout(sys.stderr):
+        summary = verify_dat_dir(jp_dat_path, jp_dir_path)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if not summary["ok"]:
+        print("Error: dat/dir integrity check failed.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()